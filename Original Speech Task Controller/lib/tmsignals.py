@@ -2,6 +2,9 @@
 import numpy as np
 from scipy.fft import irfft, rfft, rfftfreq
 
+# Unit conversions (shared with the other projects)
+from unitconv import db2mag, deg2rad, mag2db, rad2deg
+
 
 def addSynth(F0, harm, amp, phi, dur, fs = 48000):
     """ 
@@ -34,33 +37,6 @@ def addSynth(F0, harm, amp, phi, dur, fs = 48000):
     return [t, sig]
 
 
-def db2mag(db):
-    """ 
-        Convert decibels to magnitude. Takes a single
-        value or a list of values.
-    """
-    # Must use this form to handle negative db values!
-    try:
-        mag = [10**(x/20) for x in db]
-        return mag
-    except:
-        mag = 10**(db/20)
-        return mag
-
-
-def deg2rad(deg):
-    """ 
-        Convert degrees to radians. Takes a single
-        value or a list of values.
-    """
-    try:
-        rads = [np.radians(x) for x in deg]
-        return rads
-    except:
-        rads = np.radians(deg)
-        return rads
-
-
 def doFFT(sig,fs,N=2048):
     """
         Wrapper function for scipy rfft. Calculate 
@@ -206,19 +182,6 @@ def doNormalize(sig,fs=48000):
     return sig
 
 
-def mag2db(mag):
-    """ 
-        Convert magnitude to decibels. Takes a single
-        value or a list of values.
-    """
-    try:
-        db = [20 * np.log10(x) for x in mag]
-        return db
-    except:
-        db = 20 * np.log10(mag)
-        return db
-
-
 def mkBinauralNoise(freqs,dur,itd,ild,fs):
 #def mkBinauralNoise(freqs,dur,rampdur,itd,ild,fs):
     """ 
@@ -534,21 +497,6 @@ def phase2time(freq,phase):
     return itd*1000000
 
 
-def rad2deg(rad):
-    """ Convert radians to degrees. Takes a single
-        value or a list of values.
-    
-    Written by: Travis M. Moore
-    Last edited: 1/12/2022
-    """
-    try:
-        degs = [np.degrees(x) for x in rad]
-        return degs
-    except:
-        degs = np.degrees(rad)
-        return degs
-
-
 def rms(sig):
     """ 
         Calculate the root mean square of a signal. 
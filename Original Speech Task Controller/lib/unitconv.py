@@ -0,0 +1,74 @@
+""" Unit conversions for audio signal processing.
+
+    Each function is built on a NumPy ufunc and takes a
+    single value, a list (or tuple) of values, or an array
+    of any shape. The return type matches the input:
+    scalars give scalars, lists give lists and arrays give
+    arrays of the same shape.
+
+    Identical copies live next to each tmsignals.py and in
+    snr50gui/models so every project can import it locally.
+
+    Written by: Travis M. Moore
+    Created: Oct. 18, 2026
+    Last edited: Oct. 18, 2026
+"""
+
+###########
+# Imports #
+###########
+import numpy as np
+
+
+#########
+# BEGIN #
+#########
+def _convert(func, x):
+    """ Apply FUNC to X and return the same type as X """
+    if isinstance(x, np.ndarray):
+        return func(x)
+    if isinstance(x, (list, tuple)):
+        return type(x)(func(np.asarray(x, dtype=np.float64)).tolist())
+    if isinstance(x, np.generic):
+        return func(x)
+    return float(func(x))
+
+
+def _db2mag(db):
+    return np.power(10.0, np.divide(db, 20))
+
+
+def _mag2db(mag):
+    return np.multiply(20, np.log10(mag))
+
+
+def db2mag(db):
+    """
+        Convert decibels to magnitude. Takes a single
+        value, a list of values or an array.
+    """
+    return _convert(_db2mag, db)
+
+
+def mag2db(mag):
+    """
+        Convert magnitude to decibels. Takes a single
+        value, a list of values or an array.
+    """
+    return _convert(_mag2db, mag)
+
+
+def deg2rad(deg):
+    """
+        Convert degrees to radians. Takes a single
+        value, a list of values or an array.
+    """
+    return _convert(np.deg2rad, deg)
+
+
+def rad2deg(rad):
+    """
+        Convert radians to degrees. Takes a single
+        value, a list of values or an array.
+    """
+    return _convert(np.rad2deg, rad)
@@ -1,12 +1,255 @@
 #from scipy import interpolate
 import numpy as np
-from scipy.fft import irfft, rfft, rfftfreq
+from scipy.fft import irfft, next_fast_len, rfft, rfftfreq
+from scipy.io import wavfile
+from scipy.signal import get_window
+
+import functools
+import inspect
+import threading
+from collections import OrderedDict
+
+# Unit conversions (shared with the other projects)
+from unitconv import db2mag, deg2rad, mag2db
+
+
+class StimulusCache:
+    """ 
+        Memory-bounded LRU cache for the output of deterministic 
+        signal generators. Arrays are stored read-only and 
+        handed back as-is, so callers cannot corrupt a cached 
+        stimulus (copy first to modify). When the total size 
+        would exceed MAX_BYTES, the least recently used entries 
+        are evicted. Use info() to size the cache for a sweep.
+
+            MAX_BYTES: memory budget in bytes. 0 disables caching.
+
+            EXAMPLE:
+                stimcache.resize(512 * 2**20) # 512 MB
+                for itd in np.arange(-700,701,50):
+                    sig = mkBinauralNoise(freqs,0.5,itd,0,48000)
+                print(stimcache.info())
+
+        Written by: Travis M. Moore
+        Created: Oct. 18, 2026
+        Last edited: Oct. 18, 2026
+    """
+    def __init__(self, max_bytes=256 * 2**20):
+        self.max_bytes = int(max_bytes)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.clear()
+
+
+    def clear(self):
+        """ Remove all entries and reset the counters """
+        with self._lock:
+            self._entries.clear()
+            self.nbytes = 0
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+
+    def resize(self, max_bytes):
+        """ Set a new memory budget, evicting entries as needed """
+        with self._lock:
+            self.max_bytes = int(max_bytes)
+            self._evict()
+
+
+    def info(self):
+        """ Return cache counters and memory use as a dict """
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'entries': len(self._entries),
+                'nbytes': self.nbytes,
+                'max_bytes': self.max_bytes
+            }
+
+
+    def get(self, key):
+        """ Return cached value for KEY, or None if not cached """
+        with self._lock:
+            try:
+                value, nbytes = self._entries[key]
+            except KeyError:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+
+    def put(self, key, value):
+        """ Store VALUE (an array or list of arrays) under KEY. 
+            Returns the read-only version of VALUE.
+        """
+        if isinstance(value, np.ndarray):
+            value.flags.writeable = False
+            nbytes = value.nbytes
+        else:
+            for arr in value:
+                arr.flags.writeable = False
+            value = tuple(value)
+            nbytes = sum(arr.nbytes for arr in value)
+
+        with self._lock:
+            # Do not flush the whole cache for one oversized entry
+            if nbytes > self.max_bytes:
+                return value
+            if key in self._entries:
+                self.nbytes -= self._entries.pop(key)[1]
+            self._entries[key] = (value, nbytes)
+            self.nbytes += nbytes
+            self._evict()
+        return value
+
+
+    def _evict(self):
+        """ Drop least recently used entries until within budget """
+        while self.nbytes > self.max_bytes and self._entries:
+            _, (_, nbytes) = self._entries.popitem(last=False)
+            self.nbytes -= nbytes
+            self.evictions += 1
+
+
+# Shared cache for the deterministic generators below
+stimcache = StimulusCache()
+
+
+def _cacheKey(value):
+    """ Convert an argument into a hashable cache key """
+    if isinstance(value, (list, tuple, np.ndarray)):
+        arr = np.asarray(value)
+        return (arr.dtype.str, arr.shape, arr.tobytes())
+    return value
+
+
+def _frozen(func):
+    """
+        Decorator: memoize a deterministic generator in 
+        stimcache, keyed on the function name and all of its 
+        arguments (after applying defaults). Calls with 
+        SEED=None produce new random values and bypass the 
+        cache.
+    """
+    sig = inspect.signature(func)
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        bound = sig.bind(*args, **kwargs)
+        bound.apply_defaults()
+        if bound.arguments.get('seed', 0) is None:
+            return func(*args, **kwargs)
+        key = (func.__name__,) + tuple(
+            (name, _cacheKey(val)) for name, val in bound.arguments.items())
+        value = stimcache.get(key)
+        if value is None:
+            value = stimcache.put(key, func(*args, **kwargs))
+        if isinstance(value, tuple):
+            # Generators that return [t, sig] still get a list back
+            value = list(value)
+        return value
+    return wrapper
+
+
+# Max number of elements (harmonics x samples) held in memory at 
+# once by the batched synthesis engine. Keeps memory bounded for 
+# long and/or wide-band signals (2**20 float64 values = 8 MB).
+SYNTH_BLOCK = 2**20
+# Max samples per block of the synthesis engine
+SYNTH_BLOCK_SAMPS = 4096
+
+
+def _synthBlocks(freqs, amps, phis, dt, n=None, t0=0, blocksize=4096):
+    """
+        Batched additive synthesis engine (generator). Sums all 
+        sinusoids of frequency FREQS, linear amplitude AMPS and 
+        phase PHIS (radians) over N evenly spaced time points 
+        (t0, t0+dt, t0+2*dt, ...), yielding blocks of BLOCKSIZE 
+        samples (the last block may be shorter). If N is None, 
+        blocks are yielded forever.
+
+        Rather than one np.sin per component and sample, a 
+        sine/cosine table for one block of samples is built 
+        once. Every block is then two matrix-vector products 
+        using the identity:
+            sin(theta + a) = sin(theta)cos(a) + cos(theta)sin(a)
+        where THETA is each component's phase at the start of 
+        the block. The table holds at most SYNTH_BLOCK values; 
+        larger blocks are filled in several steps.
+
+            FREQS: array of frequencies (cycles per unit of DT)
+            AMPS: array of linear amplitudes
+            PHIS: array of phases in radians
+            DT: sample period (e.g., 1/fs)
+            N: number of samples, or None for no end
+            T0: time of the first sample
+            BLOCKSIZE: samples per yielded block
+
+        Written by: Travis M. Moore
+        Created: Oct. 18, 2026
+        Last edited: Oct. 18, 2026
+    """
+    w = 2 * np.pi * np.asarray(freqs, dtype=np.float64).ravel()
+    amps = np.asarray(amps, dtype=np.float64).ravel()
+    phis = np.asarray(phis, dtype=np.float64).ravel()
+
+    # Table: phase advance of each component within one step
+    step = int(min(blocksize, max(1, SYNTH_BLOCK // max(1, len(w)))))
+    a = np.multiply.outer(w, np.arange(step) * dt)
+    cos_tbl = np.cos(a)
+    sin_tbl = np.sin(a, out=a)
+
+    start = 0
+    while n is None or start < n:
+        size = blocksize if n is None else min(blocksize, n - start)
+        block = np.zeros(size)
+        if len(w) > 0:
+            for sub in range(0, size, step):
+                m = min(step, size - sub)
+                # Phase of each component at the start of the step
+                theta = w * (t0 + (start + sub) * dt) + phis
+                np.dot(amps * np.sin(theta), cos_tbl[:, :m], 
+                    out=block[sub:sub+m])
+                block[sub:sub+m] += np.dot(amps * np.cos(theta), 
+                    sin_tbl[:, :m])
+        yield block
+        start += size
+
+
+def _synthBlock(freqs, amps, phis, n, dt, t0=0, out=None):
+    """
+        Batched additive synthesis of N samples in one array. 
+        See _synthBlocks for the arguments. OUT is an optional 
+        array of length N to write to.
+
+        Written by: Travis M. Moore
+        Created: Oct. 18, 2026
+        Last edited: Oct. 18, 2026
+    """
+    if out is None:
+        out = np.zeros(n)
+    # Block length: ~sqrt(N) balances the cost of building the 
+    # table against the per-block phase calculation
+    step = int(np.clip(4 * np.sqrt(n), 256, SYNTH_BLOCK_SAMPS))
+    start = 0
+    for block in _synthBlocks(freqs, amps, phis, dt, n, t0, step):
+        out[start:start+len(block)] = block
+        start += len(block)
+    return out
 
 
 def addSynth(F0, harm, amp, phi, dur, fs = 48000):
     """ 
         Create a complex signal via additive synthesis. Returns
-        the signal AND the time base. 
+        the signal AND the time base. All harmonics are 
+        computed in a single batched pass (see _synthBlock), 
+        chunked to keep memory bounded on long signals.
         
         F0: fundamental frequency in Hz
         HARM: list of F0 harmonics for synthesis
@@ -22,84 +265,97 @@ def addSynth(F0, harm, amp, phi, dur, fs = 48000):
             [t, sig] = addSynth(100,harms,amps,phis,0.05,48000)
         
         Written by: Travis M. Moore
-        Last edited: Jan. 13, 2022
+        Last edited: Oct. 18, 2026
     """
     phi = deg2rad(phi) # phase to radians
     t = np.arange(0,dur,1/fs) # time base
-    sig = np.zeros(len(t)) # Make empty array to save memory
-    # Additive synthesis
-    for ii in range(len(harm)):
-        harmonics = amp[ii] * np.sin(2*np.pi* (F0 * harm[ii]) * t + phi[ii])
-        sig += harmonics
+    freqs = F0 * np.asarray(harm, dtype=np.float64)
+    # Batched additive synthesis
+    sig = _synthBlock(freqs, amp, phi, len(t), 1/fs)
     return [t, sig]
 
 
-def db2mag(db):
-    """ 
-        Convert decibels to magnitude. Takes a single
-        value or a list of values.
-    """
-    # Must use this form to handle negative db values!
-    try:
-        mag = [10**(x/20) for x in db]
-        return mag
-    except:
-        mag = 10**(db/20)
-        return mag
-
-
-def deg2rad(deg):
-    """ 
-        Convert degrees to radians. Takes a single
-        value or a list of values.
-    """
-    try:
-        rads = [np.radians(x) for x in deg]
-        return rads
-    except:
-        rads = np.radians(deg)
-        return rads
-
-
-def doFFT(sig,fs):
+def doFFT(sig,fs,combine=True):
     """
         Wrapper function for scipy rfft. Calculate 
         a single-sided fast Fourier transform for a 
         given signal SIG and sampling rate FS. For 
         a double-sided FFT (i.e., with negative half 
         from imaginary numbers), use scipy fft function.
+        For long or noisy recordings, use doWelch.
 
-            SIG: A 1- or 2-channel signal. Note 
-                2-channel signals are first combined.
+            SIG: A 1-channel signal or a (channels, samples) 
+                array. Note multichannel signals are first 
+                combined unless COMBINE is False.
             FS: sampling rate in Hz
+            COMBINE: if False, return one spectrum per 
+                channel (shape: channels, frequencies)
 
         Based on tutorial: https://realpython.com/python-scipy-fft/
         Adapted by: Travis M. Moore
-        Last edited: Feb. 2, 2022
+        Last edited: Oct. 18, 2026
     """
-    # Combine channels for 2-channel signals
-    if len(sig.shape) == 2:
-        combo = sig[0] + sig[1]
+    # Combine channels for multichannel signals
+    if sig.ndim == 2 and combine:
+        combo = np.sum(sig, axis=0)
         sig = combo / combo.max() # normalize
 
-    N = len(sig)
-    yf = rfft(sig)
+    N = sig.shape[-1]
+    yf = rfft(sig, axis=-1)
     xf = rfftfreq(N, 1/fs)
     #plt.plot(xf,yf)
     #plt.show()
     return xf, np.abs(yf)
 
 
-def doGate(sig,rampdur=0.02,fs=48000):
+@functools.lru_cache(maxsize=64)
+def _rampTable(nsamps):
+    """
+        Raised-cosine onset ramp of NSAMPS samples (0 to 1). 
+        Cached, so repeated gating with the same ramp duration 
+        and sampling rate does not rebuild it. The array is 
+        read-only; flip it for the offset ramp.
+
+        Written by: Travis M. Moore
+        Created: Oct. 18, 2026
+        Last edited: Oct. 18, 2026
+    """
+    gate = np.cos(np.linspace(np.pi, 2*np.pi, nsamps))
+    # Adjust envelope modulator to be within +/-1
+    gate = gate + 1 # translate modulator values to the 0/+2 range
+    gate = gate/2 # compress values within 0/+1 range
+    gate.flags.writeable = False
+    return gate
+
+
+def getRamp(rampdur, fs=48000):
+    """
+        Return the cached raised-cosine onset ramp for a ramp 
+        of RAMPDUR seconds at sampling rate FS. Read-only; use 
+        np.flip for the offset ramp.
+
+        Written by: Travis M. Moore
+        Created: Oct. 18, 2026
+        Last edited: Oct. 18, 2026
+    """
+    return _rampTable(int(fs*rampdur))
+
+
+def doGate(sig,rampdur=0.02,fs=48000,inplace=False):
     """
         Apply rising and falling ramps to signal SIG, of 
-        duration RAMPDUR. Takes a 1-channel or 2-channel 
-        signal. 
+        duration RAMPDUR. Takes a 1-channel signal or a 
+        (channels, samples) array with any number of channels. 
+        Only the ramp regions are multiplied; no full-length 
+        envelope is built.
 
-            SIG: a 1-channel or 2-channel signal
+            SIG: a 1-channel or (channels, samples) signal
             RAMPDUR: duration of one side of the gate in 
                 seconds
             FS: sampling rate in samples/second
+            INPLACE: if True, gate SIG itself (must be a 
+                writeable float array) and return it. 
+                Otherwise a gated copy is returned.
 
             Example: 
             [t, tone] = mkTone(100,0.4,0,48000)
@@ -107,28 +363,19 @@ def doGate(sig,rampdur=0.02,fs=48000):
 
         Original code: Anonymous
         Adapted by: Travis M. Moore
-        Last edited: Jan. 13, 2022          
+        Last edited: Oct. 18, 2026          
     """
-    gate =  np.cos(np.linspace(np.pi, 2*np.pi, int(fs*rampdur)))
-    # Adjust envelope modulator to be within +/-1
-    gate = gate + 1 # translate modulator values to the 0/+2 range
-    gate = gate/2 # compress values within 0/+1 range
-    # Create offset gate by flipping the array
-    offsetgate = np.flip(gate)
-    # Check number of channels in signal
-    if len(sig.shape) == 1:
-        # Create "sustain" portion of envelope
-        sustain = np.ones(len(sig)-(2*len(gate)))
-        envelope = np.concatenate([gate, sustain, offsetgate])
-        gated = envelope * sig
-    elif len(sig.shape) == 2:
-        # Create "sustain" portion of envelope
-        sustain = np.ones(len(sig[0])-(2*len(gate)))
-        envelope = np.concatenate([gate, sustain, offsetgate])
-        gatedLeft = envelope * sig[0]
-        gatedRight = envelope * sig[1]
-        gated = np.array([gatedLeft, gatedRight])
-    return gated
+    gate = getRamp(rampdur, fs)
+    nramp = len(gate)
+    if 2*nramp > sig.shape[-1]:
+        raise ValueError("Ramps are longer than the signal!")
+
+    if not inplace:
+        sig = np.array(sig, dtype=np.result_type(sig.dtype, np.float64))
+    if nramp > 0:
+        sig[..., :nramp] *= gate
+        sig[..., -nramp:] *= gate[::-1]
+    return sig
 
 
 def doLocatePeak():
@@ -138,33 +385,23 @@ def doLocatePeak():
 def doLoop(sig,numreps,sildur,fs=48000):
     """ Make a train consisting of NUMREPS of repetitions 
         of a given signal SIG separated by silence (i.e.,
-        the ISI) of duration SILDUR. Takes a 1- or 
-        2-channel signal. 
+        the ISI) of duration SILDUR. Takes a 1-channel 
+        signal or a (channels, samples) array.
 
-            SIG: a 1- or 2-channel signal
+            SIG: a 1-channel or (channels, samples) signal
             NUMREPS: number of time to repeat SIG
             SILDUR: ISI in seconds
 
         Written by Travis M. Moore
-        Last edited: 1/18/2022    
+        Last edited: Oct. 18, 2026
      """
-    if len(sig.shape) == 1:
-        # Create silence 
-        samps = sildur * fs
-        shh = np.zeros(int(samps))
-        # Create repetitions
-        justone = np.hstack([sig, shh])
-        train = np.hstack((justone,) * numreps)
-        return train
-    elif len(sig.shape) == 2:
-        # Create silence 
-        samps = sildur * fs
-        shh = np.zeros(int(samps))
-        shh = np.array([shh,shh]) # Make two channels
-        # Create repetitions
-        justone = np.hstack([sig, shh])
-        train = np.hstack((justone,) * numreps)
-        return train
+    # Create silence (same number of channels as SIG)
+    samps = sildur * fs
+    shh = np.zeros(sig.shape[:-1] + (int(samps),))
+    # Create repetitions
+    justone = np.concatenate([sig, shh], axis=-1)
+    train = np.tile(justone, numreps)
+    return train
 
 
 def doNormalize(sig,fs=48000):
@@ -176,41 +413,208 @@ def doNormalize(sig,fs=48000):
         too long for on-the-fly processing.
         Based on: myTarget = [2*(x-np.min(myTarget)) / (np.max(myTarget)-(np.min(myTarget)))-1 for x in myTarget]
 
-            SIG: a 1-channel array
+            SIG: a 1-channel array. May be a memory-mapped
+                integer array (wavfile.read(mmap=True)); it is
+                converted to float64 exactly once, with no
+                integer overflow.
             FS: the sampling rate
 
         Written by: Travis M. Moore
         Created: May 23, 2022
-        Last Edited: May 23, 2022
+        Last Edited: Oct. 18, 2026
     """
-    sig = sig-np.min(sig)
-    denom = np.max(sig) - np.min(sig)
-    sig = sig/denom
-    sig = sig * 2
-    sig = sig -1
-    return sig
+    lwr = np.min(sig)
+    denom = np.float64(np.max(sig)) - lwr
+    out = np.subtract(sig, lwr, dtype=np.float64)
+    out *= 2 / denom
+    out -= 1
+    return out
 
 
-def mag2db(mag):
-    """ 
-        Convert magnitude to decibels. Takes a single
-        value or a list of values.
+def doWelch(sig,fs,N=2048,window='hann',overlap=0.5,scaling='psd',db=False):
+    """
+        Averaged (Welch) spectrum of signal SIG. SIG is cut 
+        into overlapping segments of N samples, each segment 
+        is windowed and transformed with rfft, and the 
+        squared magnitudes are averaged. Segments are 
+        processed in batches, so memory use is bounded and 
+        SIG can be a memory-mapped array (see doWelchWav).
+
+            SIG: a 1-channel or (channels, samples) signal. 
+                Integer signals are scaled to +/-1.
+            FS: sampling rate in Hz
+            N: segment (and FFT) length in samples
+            WINDOW: window name for scipy.signal.get_window 
+                (e.g., 'hann', 'hamming', 'boxcar') or an 
+                array of N values
+            OVERLAP: fraction of each segment shared with 
+                the next (0 to <1)
+            SCALING: 'psd' for power spectral density (V**2/Hz) 
+                or 'spectrum' for power spectrum (V**2)
+            DB: if True, return 10*log10 of the result
+
+        Returns the frequencies and the averaged spectrum, 
+        with one row per channel for multichannel signals.
+
+            EXAMPLE: xf, pxx = doWelch(sig,48000,N=4096,db=True)
+
+        Written by: Travis M. Moore
+        Created: Oct. 18, 2026
+        Last edited: Oct. 18, 2026
     """
-    try:
-        db = [20 * np.log10(x) for x in mag]
-        return db
-    except:
-        db = 20 * np.log10(mag)
-        return db
+    if scaling not in ('psd', 'spectrum'):
+        raise ValueError("SCALING must be 'psd' or 'spectrum'")
+    if isinstance(window, str):
+        win = get_window(window, N)
+    else:
+        win = np.asarray(window, dtype=np.float64)
+    hop = max(1, int(round(N * (1 - overlap))))
+
+    # Integer signals are scaled to +/-1
+    if np.issubdtype(sig.dtype, np.integer):
+        info = np.iinfo(sig.dtype)
+        offset = (info.max + info.min + 1) / 2
+        scale = 1 / (info.max - offset)
+    else:
+        offset, scale = 0, 1
+
+    nsamps = sig.shape[-1]
+    nframes = 1 + max(0, nsamps - N) // hop
+    # Frames per batch, so a batch holds about SYNTH_BLOCK values
+    batch = max(1, SYNTH_BLOCK // N)
+
+    total = np.zeros(sig.shape[:-1] + (N//2 + 1,))
+    for first in range(0, nframes, batch):
+        last = min(first + batch, nframes)
+        chunk = sig[..., first*hop:(last-1)*hop + N]
+        chunk = (np.asarray(chunk, dtype=np.float64) - offset) * scale
+        if chunk.shape[-1] < N:
+            # Signal shorter than one segment: zero pad
+            pad = [(0, 0)] * (chunk.ndim - 1) + [(0, N - chunk.shape[-1])]
+            chunk = np.pad(chunk, pad)
+        frames = np.lib.stride_tricks.sliding_window_view(
+            chunk, N, axis=-1)[..., ::hop, :]
+        spec = rfft(frames * win, axis=-1)
+        total += np.sum(spec.real**2 + spec.imag**2, axis=-2)
+
+    # Average and scale; double all but DC (and Nyquist) for one side
+    if scaling == 'psd':
+        pxx = total / (nframes * fs * np.sum(win**2))
+    else:
+        pxx = total / (nframes * np.sum(win)**2)
+    if N % 2:
+        pxx[..., 1:] *= 2
+    else:
+        pxx[..., 1:-1] *= 2
+
+    xf = rfftfreq(N, 1/fs)
+    if db:
+        with np.errstate(divide='ignore'):
+            pxx = 10 * np.log10(pxx)
+    return xf, pxx
+
+
+def doWelchWav(file_path,N=2048,window='hann',overlap=0.5,scaling='psd',
+    db=False):
+    """
+        Averaged (Welch) spectrum of a .wav file. The file is 
+        memory-mapped and streamed through doWelch a batch of 
+        segments at a time, so hour-long recordings can be 
+        analyzed in bounded memory. Works with PCM files that 
+        scipy.io.wavfile can memory-map (not 24-bit).
+
+            FILE_PATH: path to the .wav file
+            See doWelch for the remaining arguments.
 
+        Returns the frequencies and the averaged spectrum, 
+        with one row per channel for multichannel files.
 
-def mkBinauralNoise(freqs,dur,itd,ild,fs):
+            EXAMPLE: xf, pxx = doWelchWav('cal.wav',N=8192,db=True)
+
+        Written by: Travis M. Moore
+        Created: Oct. 18, 2026
+        Last edited: Oct. 18, 2026
+    """
+    fs, data = wavfile.read(file_path, mmap=True)
+    # (samples, channels) -> (channels, samples) without copying
+    return doWelch(data.T, fs, N, window, overlap, scaling, db)
+
+
+def _delaySynth(freqs, amps, phis, n, delays, gains, period=None):
+    """
+        Synthesize one shared spectrum into several channels, 
+        each with its own (fractional) delay and gain. Delays 
+        are applied as a phase ramp across frequency, which is 
+        an exact fractional-sample delay for every component. 
+        Returns an array of shape (len(DELAYS), N).
+
+        If every component falls on an FFT bin of length PERIOD, 
+        one period is built with a single batched irfft and 
+        tiled out to N samples. Otherwise the batched sine 
+        engine (_synthBlock) is used for each channel.
+
+            FREQS: array of frequencies in cycles per sample
+            AMPS: array of linear amplitudes
+            PHIS: array of phases in radians
+            N: number of samples
+            DELAYS: delay for each channel in samples
+            GAINS: linear gain for each channel
+            PERIOD: FFT length (in samples) to try for the 
+                one-period FFT path
+
+        Written by: Travis M. Moore
+        Created: Oct. 18, 2026
+        Last edited: Oct. 18, 2026
+    """
+    freqs = np.asarray(freqs, dtype=np.float64)
+    amps = np.broadcast_to(np.asarray(amps, dtype=np.float64), freqs.shape)
+    phis = np.asarray(phis, dtype=np.float64)
+    delays = np.asarray(delays, dtype=np.float64)
+    gains = np.asarray(gains, dtype=np.float64)
+
+    if period:
+        bins = freqs * period
+        on_grid = (
+            np.allclose(bins, np.round(bins), rtol=0, atol=1e-6) and
+            np.all(bins > 0.5) and np.all(bins < period/2 - 0.5)
+        )
+    else:
+        on_grid = False
+
+    if on_grid:
+        bins = np.round(bins).astype(int)
+        # Shared spectrum: unit-amplitude sines (irfft divides by period/2)
+        spec = np.zeros(period//2 + 1, dtype=np.complex128)
+        np.add.at(spec, bins, (period/2) * amps * np.exp(1j * (phis - np.pi/2)))
+        # Per-channel phase ramp (delay) and gain
+        k = np.arange(len(spec))
+        ramp = np.exp(-2j * np.pi * np.outer(delays, k) / period)
+        oneperiod = irfft(gains[:, None] * ramp * spec, period, axis=-1)
+        # Repeat the period out to the full duration
+        reps = int(np.ceil(n / period))
+        return np.tile(oneperiod, (1, reps))[:, :n]
+
+    out = np.empty((len(delays), n))
+    for ch in range(len(delays)):
+        _synthBlock(freqs, gains[ch] * amps, phis - 2*np.pi*freqs*delays[ch], 
+            n, 1, out=out[ch])
+    return out
+
+
+@_frozen
+def mkBinauralNoise(freqs,dur,itd,ild,fs,seed=12):
 #def mkBinauralNoise(freqs,dur,rampdur,itd,ild,fs):
     """ 
         Create FROZEN noise and apply an ITD and/or ILD. Frozen 
         noise will produce the same noise every time the function 
         is called. Update the seed to create new noise. 
 
+        The random-phase spectrum is built once and shared by 
+        both channels (see _delaySynth). The ITD is applied as 
+        a phase ramp (exact fractional-sample delay) and the 
+        ILD as a gain per channel. For whole-Hz frequencies the 
+        noise is built with a single irfft.
+
             FREQS: list of frequencies to include in noise
             DUR: duration in seconds
             RAMPDUR: rise/fall gate duration in seconds. If 0, 
@@ -220,67 +624,35 @@ def mkBinauralNoise(freqs,dur,itd,ild,fs):
             ILD: interaural level difference in dB
                 Negative numbers favor the left. 
             FS: sampling rate in samples per second
+            SEED: seed for the random phases
+
+        Results are memoized in stimcache and returned 
+        read-only; copy the array before modifying it.
 
             EXAMPLE: 
                 freqs = np.arange(500,2001)
                 sig = ts.mkBinauralNoise(freqs,0.1,0,700,-1,48000)
 
         Written by: Travis M. Moore
-        Last edited: Jan. 13, 2022
+        Last edited: Oct. 18, 2026
     """
-    freqs = [x/fs for x in freqs] # Change array into samples
+    freqs = np.asarray(freqs, dtype=np.float64) / fs # Change array into samples
     dur = round(dur * fs) # stim duration in seconds to samples
     itd = fs * itd / 1000000 # unrounded samples
-
-    # Create time bases
-    fulldur = np.ceil(dur + np.abs(itd))
-    t = np.arange(0,fulldur,dtype=int)
-    tlead = t - np.abs(itd)/2 # time vector for leading signal
-    tlag = t + np.abs(itd)/2 # time vector for lagging signal
+    fulldur = int(np.ceil(dur + np.abs(itd)))
 
     # Set numpy random seed
-    r = np.random.RandomState(12) # only affects local seed; not global
+    r = np.random.RandomState(seed) # only affects local seed; not global
     phi = -2*np.pi + ((2*np.pi)+(2*np.pi))*r.rand(len(freqs)) # using r seed
 
-    # Additive synthesis
-    if itd > 0:
-        sigLeft = np.zeros(len(tlead))
-        for ii in range(len(freqs)):
-            harmonics = np.sin(2*np.pi* (1 * freqs[ii]) * tlead + phi[ii])
-            sigLeft += harmonics   
-        sigRight = np.zeros(len(tlag))
-        for ii in range(len(freqs)):
-            harmonics = np.sin(2*np.pi* (1 * freqs[ii]) * tlag + phi[ii])
-            sigRight += harmonics
-    elif itd < 0:
-        sigRight = np.zeros(len(tlead))
-        for ii in range(len(freqs)):
-            harmonics = np.sin(2*np.pi* (1 * freqs[ii]) * tlead + phi[ii])
-            sigRight += harmonics   
-        sigLeft = np.zeros(len(tlag))
-        for ii in range(len(freqs)):
-            harmonics = np.sin(2*np.pi* (1 * freqs[ii]) * tlag + phi[ii])
-            sigLeft += harmonics
-    elif itd == 0:
-        sigRight = np.zeros(len(t))
-        for ii in range(len(freqs)):
-            harmonics = np.sin(2*np.pi* (1 * freqs[ii]) * t + phi[ii])
-            sigRight += harmonics   
-        sigLeft = np.zeros(len(t))
-        for ii in range(len(freqs)):
-            harmonics = np.sin(2*np.pi* (1 * freqs[ii]) * t + phi[ii])
-            sigLeft += harmonics
+    # Left channel is delayed by half the ITD, right advanced by half
+    delays = [itd/2, -itd/2]
+    # Split the ILD across channels
+    gains = db2mag(np.array([-ild/2, ild/2]))
 
-    # Apply ILD
-    if ild > 0:
-        sigLeft = sigLeft / db2mag(np.abs(ild/2))
-        sigRight = sigRight * db2mag(np.abs(ild/2))
-    elif ild < 0:
-        sigLeft = sigLeft * db2mag(np.abs(ild/2))
-        sigRight = sigRight / db2mag(np.abs(ild/2))
-
-    # Assign noises to left/right channels
-    sigBoth = np.array([sigLeft, sigRight])
+    # Synthesize both channels from the shared spectrum
+    period = int(fs) if float(fs).is_integer() else None
+    sigBoth = _delaySynth(freqs, 1, phi, fulldur, delays, gains, period)
 
     """
     # Apply gates
@@ -294,6 +666,7 @@ def mkBinauralNoise(freqs,dur,itd,ild,fs):
     return sigBoth
 
 
+@_frozen
 def mkGaborClick(cf, dur, itd, ild, fs):
     """ 
         MKGABORCLICKS Generate two Gabor clicks with a 
@@ -307,6 +680,8 @@ def mkGaborClick(cf, dur, itd, ild, fs):
 
         Example: gclick = mkGaborClick(4000,0.002,300,2,48000);
 
+        Memoized in stimcache; the array is returned read-only.
+
        Author: Chris Stecker
        Adapted by: Travis Moore
        Date of MATLAB adaptation: Apr. 19, 2017
@@ -351,6 +726,7 @@ def mkGaborClick(cf, dur, itd, ild, fs):
     return clickBoth
 
 
+@_frozen
 def mkIPD(freq,dur,ipd,ild,fs=48000):
     """
         Create a binaural pure tone at frequency FREQ 
@@ -365,6 +741,8 @@ def mkIPD(freq,dur,ipd,ild,fs=48000):
 
             EXAMPLE: sig = mkIPD(500,0.1,90,-2,48000)
 
+        Memoized in stimcache; the array is returned read-only.
+
         Written by: Travis M. Moore
         Last edited: Jan. 19, 2022
     """
@@ -390,6 +768,7 @@ def mkIPD(freq,dur,ipd,ild,fs=48000):
     return sig2chan
 
 
+@_frozen
 def mkITD(freq,dur,itd,ild,rampdur,fs=48000):
     """
         Create a binaural pure tone at frequency FREQ with 
@@ -406,8 +785,10 @@ def mkITD(freq,dur,itd,ild,rampdur,fs=48000):
 
             EXAMPLE: sig = mkITD(500,0.05,800,0,0.02,48000)
 
+        Memoized in stimcache; the array is returned read-only.
+
         Written by: Travis M. Moore
-        Last edited: Feb. 8, 2022
+        Last edited: Oct. 18, 2026
     """
     freq = freq / fs # CPS to cycles per sample
     dur = round(dur * fs) # stim duration in seconds to samples
@@ -421,33 +802,31 @@ def mkITD(freq,dur,itd,ild,rampdur,fs=48000):
     tlead = t - (np.abs(itd)/2) # time vector for leading signal
     tlag = t + (np.abs(itd)/2) # time vector for lagging signal
 
-    #gate = np.cos(np.linspace(np.pi, 2*np.pi, int(fs*rampdur)))
-    gate = np.cos(np.linspace(np.pi, 2*np.pi, rampdur))
-    # Adjust envelope modulator to be within +/-1
-    gate = gate + 1 # translate modulator values to the 0/+2 range
-    gate = gate/2 # compress values within 0/+1 range
-    # Create offset gate by flipping the array
-    offsetgate = np.flip(gate)
-    # Create "sustain" portion of envelope
-    sustain = np.ones(len(tlead)-(2*len(gate))-itd_int)
-    # Create padding for itd offset
-    pad = np.zeros(itd_int)
-
-    # Create gated ITD signal
+    gate = _rampTable(rampdur) # cached onset ramp
+    envlen = len(tlead) - itd_int # gated portion of each channel
+
+    # Create ITD signal
     if itd < 0:
-        envelopeLeft = np.concatenate([gate, sustain, offsetgate, pad])
-        lchan = np.sin(2*np.pi*freq*tlag) * envelopeLeft
-        envelopeRight = np.concatenate([pad, gate, sustain, offsetgate])
-        rchan = np.sin(2*np.pi*freq*tlead) * envelopeRight
+        lchan = np.sin(2*np.pi*freq*tlag)
+        rchan = np.sin(2*np.pi*freq*tlead)
+        onsets = [0, itd_int]
     elif itd > 0:
-        envelopeLeft = np.concatenate([pad,gate, sustain, offsetgate])
-        lchan = np.sin(2*np.pi*freq*tlead) * envelopeLeft
-        envelopeRight = np.concatenate([gate, sustain, offsetgate, pad])
-        rchan = np.sin(2*np.pi*freq*tlag) * envelopeRight
+        lchan = np.sin(2*np.pi*freq*tlead)
+        rchan = np.sin(2*np.pi*freq*tlag)
+        onsets = [itd_int, 0]
     elif itd == 0:
-        envelope = np.concatenate([gate, sustain, offsetgate])
-        lchan = np.sin(2*np.pi*freq*t) * envelope
-        rchan = np.sin(2*np.pi*freq*t) * envelope
+        lchan = np.sin(2*np.pi*freq*t)
+        rchan = np.sin(2*np.pi*freq*t)
+        onsets = [0, 0]
+
+    # Gate in place: only touch the ramps and ITD padding
+    for chan, onset in zip([lchan, rchan], onsets):
+        offset = onset + envlen
+        chan[:onset] = 0
+        chan[offset:] = 0
+        if len(gate) > 0:
+            chan[onset:onset+len(gate)] *= gate
+            chan[offset-len(gate):offset] *= gate[::-1]
     
     # Apply ILD
     if ild < 0:
@@ -461,27 +840,100 @@ def mkITD(freq,dur,itd,ild,rampdur,fs=48000):
     return sigBoth
 
 
-def mkNoise(freqs,dur,fs):
-    """ Create a brief noise using additive synthesis and random 
-        phases. WARNING: Durations longer than 1 second will 
-        repeat. Large bandwidths can take a while to process.
+def _fftNoise(lwr, upr, n, fs, r):
+    """
+        Spectral-domain noise engine. Fills an rfft buffer with 
+        unit magnitudes and random phases between LWR and UPR 
+        (inclusive) and inverse transforms it in one shot. The 
+        FFT is padded to a fast length and truncated to N 
+        samples, so the noise never repeats within the signal.
+        Returns the noise and the number of bins in the band.
+
+            LWR: lower band edge in Hz
+            UPR: upper band edge in Hz
+            N: number of samples
+            FS: sampling rate in Hz
+            R: np.random.RandomState used for the phases
+
+        Written by: Travis M. Moore
+        Created: Oct. 18, 2026
+        Last edited: Oct. 18, 2026
+    """
+    nfft = next_fast_len(n, real=True)
+    f = rfftfreq(nfft, 1/fs)
+    # Exclude DC; a random phase there would be a constant offset
+    band = np.flatnonzero((f >= lwr) & (f <= upr) & (f > 0))
+    spec = np.zeros(len(f), dtype=np.complex128)
+    phi = -2*np.pi + ((2*np.pi)+(2*np.pi))*r.rand(len(band))
+    # Unit-amplitude sinusoid per bin: irfft divides by nfft/2
+    spec[band] = (nfft/2) * np.exp(1j * (phi - np.pi/2))
+    noise = irfft(spec, nfft)[:n]
+    return noise, len(band)
+
+
+def _combNoise(freqs, n, fs, r):
+    """
+        Sum of unit-amplitude sinusoids at FREQS (Hz) with 
+        random phases, N samples long. When every frequency is 
+        a whole number of Hz below Nyquist, the sum repeats 
+        every fs/gcd(fs, FREQS) samples, so the frequencies 
+        fall exactly on the bins of an FFT of a whole number 
+        of periods: the spectrum is filled at those bins only 
+        and inverse transformed in one shot. Otherwise the 
+        sinusoids are summed directly (see _synthBlock).
+
+            FREQS: frequencies in Hz
+            N: number of samples
+            FS: sampling rate in Hz
+            R: np.random.RandomState used for the phases
+
+        Written by: Travis M. Moore
+        Created: Oct. 18, 2026
+        Last edited: Oct. 18, 2026
+    """
+    freqs = np.asarray(freqs, dtype=np.float64).ravel()
+    phi = -2*np.pi + ((2*np.pi)+(2*np.pi))*r.rand(len(freqs))
+    ints = np.round(freqs).astype(np.int64)
+    if (float(fs).is_integer() and np.array_equal(ints, freqs) 
+            and np.all((ints > 0) & (2*ints < fs))):
+        g = int(np.gcd.reduce(np.append(ints, int(fs))))
+        period = int(fs) // g # samples
+        nfft = period * -(-n // period) # whole periods, >= N
+        bins = (ints // g) * (nfft // period)
+        spec = np.zeros(nfft//2 + 1, dtype=np.complex128)
+        # Unit-amplitude sinusoid per bin: irfft divides by nfft/2
+        np.add.at(spec, bins, (nfft/2) * np.exp(1j * (phi - np.pi/2)))
+        return irfft(spec, nfft)[:n]
+    return _synthBlock(freqs, np.ones(len(freqs)), phi, n, 1/fs)
+
+
+@_frozen
+def mkNoise(freqs,dur,fs,seed=None):
+    """ Create noise from unit-amplitude sinusoids at each 
+        frequency in FREQS with random phases (e.g., a 10 Hz 
+        comb for the example below). For whole-Hz frequencies 
+        the spectrum is built directly in the frequency domain 
+        and inverse transformed (see _combNoise), so any 
+        duration can be generated quickly; the noise repeats 
+        as additive synthesis does, every 1/gcd(FREQS) seconds.
         
             FREQS: a list of frequencies to be included in the noise
             DUR: duration in seconds
             FS: sampling rate in Hz
+            SEED: seed for the random phases. Give the same 
+                value to get the same noise back. 
+
+        Noise made with a SEED is memoized in stimcache and 
+        returned read-only.
 
             EXAMPLE: sig = mkNoise(np.arange(250,3010,10),0.5,48000)
 
         Written by Travis M. Moore
-        Last edited: 1/13/2022
+        Last edited: Oct. 18, 2026
     """
-    # Create arbitrary amplitudes for addSynth
-    amp = np.ones(len(freqs))
-    # Create random phases
-    phi = -2*np.pi + ((2*np.pi)+(2*np.pi))*np.random.rand(len(freqs))
-    phi = rad2deg(phi) # addSynth function wants degrees
-    [t, myNoise] = addSynth(1,freqs,amp,phi,dur,fs)
-    return myNoise
+    r = np.random.RandomState(seed) # only affects local seed; not global
+    n = round(dur * fs) # stim duration in seconds to samples
+    return _combNoise(freqs, n, fs, r)
 
 
 def mkTone(freq, dur, phi=0, fs=48000):
@@ -519,49 +971,84 @@ def phase2time(freq,phase):
     return itd*1000000
 
 
-def rad2deg(rad):
-    """ Convert radians to degrees. Takes a single
-        value or a list of values.
-    
-    Written by: Travis M. Moore
-    Last edited: 1/12/2022
-    """
-    try:
-        degs = [np.degrees(x) for x in rad]
-        return degs
-    except:
-        degs = np.degrees(rad)
-        return degs
-
-
-def rms(sig):
+def rms(sig, axis=None):
     """ 
-        Calculate the root mean square of a signal. 
-        
-        NOTE: np.square will return invalid, negative 
-            results if the number excedes the bit 
-            depth. In these cases, convert to int64
-            EXAMPLE: sig = np.array(sig,dtype=int)
+        Calculate the root mean square of a signal. The sum 
+        of squares is taken in a single pass (no squared copy 
+        of the signal) and accumulated in float64, so integer 
+        and float32 signals do not overflow or lose precision.
+
+            SIG: the signal
+            AXIS: axis to average over. Use AXIS=-1 to get 
+                one value per channel of a (channels, samples) 
+                array. Default is the whole array.
 
         Written by: Travis M. Moore
-        Last edited: Feb. 3, 2020
+        Last edited: Oct. 18, 2026
     """
-    theRMS = np.sqrt(np.mean(np.square(sig)))
+    sig = np.asarray(sig)
+    if axis is None:
+        sig = sig.reshape(-1)
+    else:
+        sig = np.moveaxis(sig, axis, -1)
+    sumsq = np.einsum('...i,...i->...', sig, sig, dtype=np.float64)
+    theRMS = np.sqrt(sumsq / sig.shape[-1])
     return theRMS
 
 
-def setRMS(sig,amp,eq='n'):
+def rmsGain(sig,amp,eq='n'):
+    """
+        Calculate the linear gain(s) that setRMS applies to 
+        SIG to reach AMP dB, from a single reduction over all 
+        channels. Returns a scalar for 1-channel signals and 
+        for EQ='n', or one gain per channel with shape 
+        (channels, 1) for EQ='y', ready to broadcast against 
+        SIG. See setRMS for the arguments.
+
+        Written by: Travis M. Moore
+        Created: Oct. 18, 2026
+        Last edited: Oct. 18, 2026
+    """
+    # Level of each channel in dB (one value for 1-channel signals)
+    with np.errstate(divide='ignore'):
+        rmsdb = mag2db(rms(sig, axis=-1))
+    audible = np.isfinite(rmsdb)
+
+    if np.ndim(sig) == 2 and eq == 'n':
+        # Same gain for every channel: keeps level differences
+        # (e.g., ILDs) and sets the mean channel level to AMP
+        if np.any(audible):
+            return db2mag(amp - np.mean(rmsdb[audible]))
+        return 1.0
+
+    # Set each channel to AMP; silent channels are left alone
+    gaindb = np.where(audible, amp - rmsdb, 0)
+    if np.ndim(sig) == 2:
+        return db2mag(gaindb)[:, None]
+    return db2mag(float(gaindb))
+
+
+def setRMS(sig,amp,eq='n',out=None):
     """
-        Set RMS level of a 1-channel or 2-channel signal.
+        Set RMS level of a 1-channel signal or a 
+        (channels, samples) array with any number of channels. 
+        Channel levels come from one reduction (see rmsGain) 
+        and the gain is applied in one pass, so leveling 
+        reads the signal twice and writes it once.
     
-        SIG: a 1-channel or 2-channel signal
+        SIG: a 1-channel or (channels, samples) signal
         AMP: the desired amplitude to be applied to 
             each channel. Note this will be the RMS 
-            per channel, not the total of both channels.
+            per channel, not the total of all channels.
         EQ: takes 'y' or 'n'. Whether or not to equalize 
-            the levels in a 2-channel signal. For example, 
+            the levels across channels. For example, 
             a signal with an ILD would lose the ILD with 
-            EQ='y', so the default in 'n'.
+            EQ='y', so the default in 'n'. With EQ='n' the 
+            level differences between channels are kept and 
+            the mean channel level (in dB) is set to AMP. 
+            Silent channels are left silent.
+        OUT: optional array to write the result to. Use 
+            OUT=SIG to level a float signal in place.
 
         EXAMPLE: 
         Create a 2 channel signal
@@ -572,65 +1059,11 @@ def setRMS(sig,amp,eq='n'):
 
         Written by: Travis M. Moore
         Created: Jan. 10, 2022
-        Last edited: May 17, 2022
-    """
-    if len(sig.shape) == 1:
-        rmsdb = mag2db(rms(sig))
-        refdb = amp
-        diffdb = np.abs(rmsdb - refdb)
-        if rmsdb > refdb:
-            sigAdj = sig / db2mag(diffdb)
-        elif rmsdb < refdb:
-            sigAdj = sig * db2mag(diffdb)
-        # Edit 5/17/22
-        # Added handling for when rmsdb == refdb
-        elif rmsdb == refdb:
-            sigAdj = sig
-        return sigAdj
-        
-    elif len(sig.shape) == 2:
-        rmsdbLeft = mag2db(rms(sig[0]))
-        rmsdbRight = mag2db(rms(sig[1]))
-
-        ILD = np.abs(rmsdbLeft - rmsdbRight) # get lvl diff
-
-        # Determine lvl advantage
-        if rmsdbLeft > rmsdbRight:
-            lvlAdv = 'left'
-            #print("Adv: %s" % lvlAdv)
-        elif rmsdbRight > rmsdbLeft:
-            lvlAdv = 'right'
-            #print("Adv: %s" % lvlAdv)
-        elif rmsdbLeft == rmsdbRight:
-            lvlAdv = None
-
-        #refdb = amp - 3 # apply half amp to each channel
-        refdb = amp
-        diffdbLeft = np.abs(rmsdbLeft - refdb)
-        diffdbRight = np.abs(rmsdbRight - refdb)
-
-        # Adjust left channel
-        if rmsdbLeft > refdb:
-            sigAdjLeft = sig[0] / db2mag(diffdbLeft)
-        elif rmsdbLeft < refdb:
-            sigAdjLeft = sig[0] * db2mag(diffdbLeft)
-        # Adjust right channel
-        if rmsdbRight > refdb:
-            sigAdjRight = sig[1] / db2mag(diffdbRight)
-        elif rmsdbRight < refdb:
-            sigAdjRight = sig[1] * db2mag(diffdbRight)
-
-        # If there is a lvl difference to maintain across channels
-        if eq == 'n':
-            if lvlAdv == 'left':
-                sigAdjLeft = sigAdjLeft * db2mag(ILD/2)
-                sigAdjRight = sigAdjRight / db2mag(ILD/2)
-            elif lvlAdv == 'right':
-                sigAdjLeft = sigAdjLeft / db2mag(ILD/2)
-                sigAdjRight = sigAdjRight * db2mag(ILD/2)
-
-        sigBothAdj = np.array([sigAdjLeft, sigAdjRight])
-        return sigBothAdj
+        Last edited: Oct. 18, 2026
+    """
+    gain = rmsGain(sig, amp, eq)
+    sigAdj = np.multiply(sig, gain, out=out)
+    return sigAdj
 
 
 def specLvl(sig, upr, lwr):
@@ -651,6 +1084,182 @@ def specLvl(sig, upr, lwr):
     return SPLnb
 
 
+def _nsamps(dur, fs):
+    """ Number of samples in np.arange(0,dur,1/fs), without 
+        building the time base. None (no end) passes through.
+    """
+    if dur is None:
+        return None
+    return int(np.ceil(dur / (1/fs)))
+
+
+def streamITD(freq,dur,itd,ild,rampdur,fs=48000,blocksize=4096):
+    """
+        Generator version of mkITD. Yields (2, BLOCKSIZE) blocks 
+        of a gated binaural pure tone with an ITD and/or ILD. 
+        Phase and gating are continuous across blocks, and the 
+        concatenated blocks equal mkITD's output.
+
+            FREQ: frequency in Hz
+            DUR: duration in seconds
+            ITD: time difference in MICROSECONDS
+            ILD: level difference in dB
+            RAMPDUR: duration of gating in seconds
+            FS: sampling rate in Hz
+            BLOCKSIZE: samples per block
+
+            EXAMPLE: 
+                for block in streamITD(500,60,800,0,0.02,48000):
+                    stream.write(block.T.astype(np.float32))
+
+        Written by: Travis M. Moore
+        Created: Oct. 18, 2026
+        Last edited: Oct. 18, 2026
+    """
+    freq = freq / fs # CPS to cycles per sample
+    dur = round(dur * fs) # stim duration in seconds to samples
+    itd = fs * itd / 1000000 # unrounded samples
+    itd_int = int(np.ceil(np.abs(itd)/2)) # rounded itd samples
+    rampdur = round(rampdur * fs)
+    fulldur = int(np.ceil(dur + np.abs(itd)))
+
+    gate = _rampTable(rampdur) # cached onset ramp
+
+    # Onset (in samples) of each channel's envelope
+    envlen = fulldur - itd_int
+    if itd > 0:
+        onsets = [itd_int, 0]
+    elif itd < 0:
+        onsets = [0, itd_int]
+    else:
+        onsets = [0, 0]
+        envlen = fulldur
+    # Left channel time base is t - itd/2; right is t + itd/2
+    shifts = np.array([[-itd/2], [itd/2]])
+    gains = db2mag(np.array([[-ild/2], [ild/2]]))
+
+    for start in range(0, fulldur, blocksize):
+        n = np.arange(start, min(start + blocksize, fulldur))
+        block = np.sin(2*np.pi*freq*(n + shifts))
+        for ch, onset in enumerate(onsets):
+            # Position of each sample within the channel's envelope
+            pos = n - onset
+            env = np.ones(len(n))
+            env[(pos < 0) | (pos >= envlen)] = 0
+            rise = (pos >= 0) & (pos < rampdur)
+            env[rise] = gate[pos[rise]]
+            fall = (pos >= envlen - rampdur) & (pos < envlen)
+            env[fall] = gate[::-1][pos[fall] - (envlen - rampdur)]
+            block[ch] *= env
+        block *= gains
+        yield block
+
+
+def streamNoise(freqs,dur,fs,seed=None,blocksize=4096):
+    """
+        Streaming band noise. Yields blocks of BLOCKSIZE 
+        samples of band-limited noise with constant memory 
+        use, so maskers of any length (or DUR=None for no end) 
+        can be fed straight to an output stream. Unlike 
+        mkNoise, every FFT bin between the lowest and highest 
+        values in FREQS is filled (FREQS only sets the band 
+        edges and the level), so the noise never repeats.
+
+        Each frame of 2*BLOCKSIZE samples is FFT noise (see 
+        _fftNoise) shaped by a sine window. Frames overlap by 
+        half; since sin^2 + cos^2 = 1 the crossfades keep the 
+        level constant and there are no discontinuities.
+
+            FREQS: a list of frequencies to be included in the noise
+            DUR: duration in seconds, or None for no end
+            FS: sampling rate in Hz
+            SEED: seed for the random phases
+            BLOCKSIZE: samples per block
+
+            EXAMPLE: 
+                for block in streamNoise(np.arange(250,3001),600,48000):
+                    stream.write(block.astype(np.float32))
+
+        Written by: Travis M. Moore
+        Created: Oct. 18, 2026
+        Last edited: Oct. 18, 2026
+    """
+    r = np.random.RandomState(seed) # only affects local seed; not global
+    n = _nsamps(dur, fs)
+    lwr, upr = np.min(freqs), np.max(freqs)
+    frame = 2 * blocksize
+    win = np.sin(np.pi * (np.arange(frame) + 0.5) / frame)
+
+    def nextframe():
+        noise, nbins = _fftNoise(lwr, upr, frame, fs, r)
+        if nbins > 0:
+            noise *= np.sqrt(len(freqs) / nbins)
+        return noise * win
+
+    prev = nextframe()
+    start = 0
+    while n is None or start < n:
+        cur = nextframe()
+        block = prev[blocksize:] + cur[:blocksize]
+        prev = cur
+        if n is not None:
+            block = block[:n-start]
+        yield block
+        start += len(block)
+
+
+def streamSynth(F0,harm,amp,phi,dur,fs=48000,blocksize=4096):
+    """
+        Generator version of addSynth. Yields blocks of 
+        BLOCKSIZE samples with continuous phase across blocks, 
+        without building the full signal or time base. 
+
+            F0: fundamental frequency in Hz
+            HARM: list of F0 harmonics for synthesis
+            AMP: linear amplitude of each harmonic
+            PHI: phase in degrees
+            DUR: duration in seconds, or None for no end
+            FS: sampling rate in samples/second
+            BLOCKSIZE: samples per block
+
+        Written by: Travis M. Moore
+        Created: Oct. 18, 2026
+        Last edited: Oct. 18, 2026
+    """
+    freqs = F0 * np.asarray(harm, dtype=np.float64)
+    yield from _synthBlocks(freqs, amp, deg2rad(phi), 1/fs, 
+        _nsamps(dur, fs), blocksize=blocksize)
+
+
+def streamTone(freq,dur,phi=0,fs=48000,blocksize=4096):
+    """
+        Generator version of mkTone. Yields blocks of BLOCKSIZE 
+        samples with continuous phase across blocks. Phase is 
+        computed from the running sample count, so it does 
+        not drift on long signals.
+
+            FREQ: frequency in Hz
+            DUR: duration in SECONDS, or None for no end
+            PHI: phase in DEGREES
+            FS: sampling rate
+            BLOCKSIZE: samples per block
+
+        Written by: Travis M. Moore
+        Created: Oct. 18, 2026
+        Last edited: Oct. 18, 2026
+    """
+    phi = np.deg2rad(phi) # to radians
+    n = _nsamps(dur, fs)
+    step = np.arange(blocksize) * (freq / fs) # cycles within a block
+    start = 0
+    while n is None or start < n:
+        size = blocksize if n is None else min(blocksize, n - start)
+        # Cycles elapsed at the start of the block (wrapped to 0-1)
+        cyc = (start * freq / fs) % 1.0
+        yield np.sin(2*np.pi*(cyc + step[:size]) + phi)
+        start += size
+
+
 def time2phase(freq,itd):
     """
         Calculate a phase shift in DEGREES from an ITD
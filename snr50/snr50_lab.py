@@ -49,11 +49,11 @@ import pandas as pd
 import os
 import sys
 from scipy.io import wavfile
-import sounddevice as sd
 
 
 sys.path.append('.\\lib') # Point to custom library file
 import tmsignals as ts # Custom library
+import audioengine # Persistent output stream
 import importlib 
 importlib.reload(ts) # Reload custom module on every run
 
@@ -105,7 +105,6 @@ if expInfo['Calibration'] == 'y':
     calStim = ts.doNormalize(calStim, 48000)
     # Set target level
     calStim = ts.setRMS(calStim,REF_LEVEL,eq='n')
-    sigdur = len(calStim) / fs
     # Present using PsychoPy PTB
     # probe = sound.Sound(value=calStim.T,
     #     secs=sigdur, stereo=-1, volume=1.0, loops=0, 
@@ -114,9 +113,11 @@ if expInfo['Calibration'] == 'y':
     #     autoLog=True)
     # probe.play()
     # core.wait(probe.secs+0.001)
-    # Present using sounddevice
-    sd.play(calStim,fs)
-    core.wait(sigdur+0.01)
+    # Present using the persistent output stream
+    # One output channel per file channel, as sd.play opened
+    # Wait until the last sample has left the output
+    nchans = 1 if calStim.ndim == 1 else calStim.shape[1]
+    audioengine.get_engine(fs, channels=nchans).play(calStim).wait()
     core.quit()
 #################################
 #### END CALIBRATION ROUTINE ####
@@ -275,7 +276,6 @@ for thisIncrement in staircase:
     win.flip()
 
     # Play stimulus
-    sigdur = len(myTarget) / fs
      # Present using PsychoPy PTB
     # probe = sound.Sound(value=myTarget.T,
     #     secs=sigdur, stereo=-1, volume=1.0, loops=0, 
@@ -284,9 +284,12 @@ for thisIncrement in staircase:
     #     autoLog=True)
     # probe.play()
     # core.wait(probe.secs+0.001)
-    # Present using sounddevice
-    sd.play(myTarget, fs)
-    core.wait(sigdur+0.01)
+    # Present using the persistent output stream (opened 
+    # on the first trial and kept open for the session)
+    # One output channel per file channel, as sd.play opened
+    # Wait until the last sample has left the output
+    nchans = 1 if myTarget.ndim == 1 else myTarget.shape[1]
+    audioengine.get_engine(fs, channels=nchans).play(myTarget).wait()
 
     # Clear the window
     text_stim.setText(" ")
@@ -371,4 +374,5 @@ win.flip()
 event.waitKeys() # wait for participant to respond
 
 win.close()
+audioengine.close_engine()
 core.quit()
@@ -0,0 +1,110 @@
+""" Level accuracy check for the float32 audio path.
+
+    Writes int16, int32 and float32 test files (mono, and
+    stereo with the second channel 6 dB down), plays each
+    through Audio.play on the null audio backend, in memory
+    and memory-mapped, and measures the level of what reaches
+    the output buffer. Audio.play levels each channel to the
+    target on its own, so every output channel should be at
+    the target level. Asserts that the float32 working dtype
+    stays within 0.01 dB of the float64 path on every output
+    channel.
+    Run from the snr50gui directory:
+
+        python audiomodel_check.py
+
+    Written by: Travis M. Moore
+    Created: Oct. 18, 2026
+    Last edited: Oct. 18, 2026
+"""
+
+# Import published modules
+import numpy as np
+import os
+import tempfile
+import time
+from scipy.io import wavfile
+
+# Play on the null backend (no audio hardware needed)
+os.environ['SNR50_AUDIO_BACKEND'] = 'null'
+
+# Import custom modules
+from models import audioengine
+from models import audiomodel
+
+
+# Largest allowed level difference from the float64 path
+TOLERANCE_DB = 0.01
+
+FS = 48000
+DUR = 0.25
+LEVEL = -25.0
+
+
+def make_files(directory):
+    """ Write the test files; return {name: path} """
+    rng = np.random.default_rng(1)
+    noise = rng.standard_normal(int(FS * DUR)) * 0.1
+    signals = {
+        'mono': noise,
+        'stereo': np.column_stack([noise, 0.5 * rng.permutation(noise)])
+    }
+    files = {}
+    for layout, sig in signals.items():
+        for dtype in ('int16', 'int32', 'float32'):
+            if dtype == 'float32':
+                data = sig.astype(np.float32)
+            else:
+                data = np.round(sig * np.iinfo(dtype).max).astype(dtype)
+            path = os.path.join(directory, f"{dtype}_{layout}.wav")
+            wavfile.write(path, FS, data)
+            files[f"{dtype} {layout}"] = path
+    return files
+
+
+def output_levels(audio, channels):
+    """ Play AUDIO on the null backend and return the dB FS
+        RMS of each output channel in CHANNELS, over the
+        length of the file.
+    """
+    engine = audioengine.get_engine(audio.fs, channels=max(channels))
+    engine.stream.recorded = []
+    engine.stream.record = True
+    audio.play(None, channels).wait()
+    # Let the block holding the last sample be recorded
+    time.sleep(4 * engine.stream.blocksize / audio.fs)
+    engine.stream.record = False
+    out = np.concatenate(engine.stream.recorded)
+    sumsq = np.einsum('ij,ij->j', out, out, dtype=np.float64)
+    rms = np.sqrt(sumsq / len(audio.original_audio))
+    return audiomodel.Audio.mag2db(rms[np.asarray(channels) - 1])
+
+
+def check_levels():
+    print("\nLevel accuracy: float32 vs. float64 path " +
+        f"(tolerance {TOLERANCE_DB} dB)")
+    print(f"{'file':>15} {'reader':>7} {'float64 (dB)':>20} " +
+        f"{'float32 (dB)':>20} {'max diff':>9}")
+    worst = 0.0
+    with tempfile.TemporaryDirectory() as directory:
+        for name, path in make_files(directory).items():
+            channels = [1] if name.endswith('mono') else [1, 2]
+            ref = output_levels(audiomodel.Audio(path, LEVEL,
+                mmap=False, dtype=np.float64), channels)
+            for mmap in (False, True):
+                new = output_levels(audiomodel.Audio(path, LEVEL,
+                    mmap=mmap, dtype=np.float32), channels)
+                diff = np.max(np.abs(new - ref))
+                worst = max(worst, diff)
+                reader = 'mmap' if mmap else 'memory'
+                print(f"{name:>15} {reader:>7} " +
+                    f"{np.array2string(ref, precision=4):>20} " +
+                    f"{np.array2string(new, precision=4):>20} {diff:>9.2e}")
+                assert diff <= TOLERANCE_DB, \
+                    f"{name} ({reader}) is {diff:.4f} dB off the float64 path!"
+    audioengine.close_engine()
+    print(f"Largest difference: {worst:.2e} dB")
+
+
+if __name__ == '__main__':
+    check_levels()
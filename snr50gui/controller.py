@@ -35,8 +35,10 @@ from menus import mainmenu as menu_main
 # Model imports
 from models import sessionmodel as m_sesspars
 from models import audiomodel as m_audio
+from models import audioengine as m_engine
 from models import listmodel as m_list
 from models import csvmodel as m_csv
+from models import storemodel as m_store
 from models import scoremodel as m_score
 # View imports
 from views import main as v_main
@@ -51,6 +53,10 @@ from views import calibration as v_cal
 class Application(tk.Tk):
     """ Application root window
     """
+    # Session parameters that are not written to the data files
+    unsaved_fields = ['Speaker Number', 'Audio Files Path', 
+        'Sentence File Path', 'Audio Device ID', 'Calibration File']
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
@@ -81,14 +87,26 @@ class Application(tk.Tk):
 
         # Create and load list model
         self.listmodel = m_list.StimulusList(self.sessionpars)
+        # Lists are only reloaded when these values change (or 
+        # until a load finds stimuli)
+        self._loaded_lists = None
         try:
-            self.listmodel.load()
+            if self.listmodel.load():
+                self._loaded_lists = self._list_key()
         except FileNotFoundError:
             pass
 
+        # Calibration offset, cached until the calibration changes
+        self._cal_key = None
+
         # Create score model
         self.scoremodel = m_score.ScoreModel()
 
+        # Create typed trial store (written alongside the .csv)
+        self.trialstore = m_store.TrialStore(m_store.make_schema(
+            self.sessionpars_model.fields, self.scoremodel.fields,
+            exclude=self.unsaved_fields))
+
         # Create main view
         self.main_frame = v_main.MainFrame(self, self.scoremodel, 
             self.sessionpars, self.listmodel)
@@ -124,7 +142,7 @@ class Application(tk.Tk):
             # Mainframe commands
             '<<SubmitResponse>>': lambda _: self._on_main_submit(),
             '<<MainDone>>': lambda _: self._main_done(),
-            '<<GetLevel>>': lambda _: self._calc_level(),
+            '<<GetLevel>>': lambda _: self._update_level(),
             '<<MainStart>>': lambda _: self._disable_mnu()
         }
 
@@ -167,6 +185,10 @@ class Application(tk.Tk):
     def _quit(self):
         """ Exit the application
         """
+        # Write any pending records before closing
+        self.csvmodel.close()
+        self.trialstore.close()
+        self.sessionpars_model.flush()
         self.destroy()
 
 
@@ -235,9 +257,7 @@ class Application(tk.Tk):
             data[key] = self.sessionpars[key].get()
 
         # Only write specific sessionpars to file
-        drop_list = ['Speaker Number', 'Audio Files Path', 
-            'Sentence File Path', 'Audio Device ID', 'Calibration File']
-        [data.pop(e) for e in drop_list]
+        [data.pop(e) for e in self.unsaved_fields]
 
         # Combine sessionpars dict and scoremodel dict for writing
         data.update(self.scoremodel.fields)
@@ -246,12 +266,18 @@ class Application(tk.Tk):
         print('App_206: Calling save record function...')
         try:
             self.csvmodel.save_record(data)
-        except PermissionError():
-            messagebox.showerror(title="Save Failed!",
-                message="Could not save data to file!",
-                detail="Please make sure the file isn't open and that you " +
-                    "have write permission."
-            )
+            self.trialstore.write(data, self.csvmodel.file)
+        except (PermissionError, ValueError):
+            self._save_failed()
+
+
+    def _save_failed(self):
+        """ Tell the user that data were not saved """
+        messagebox.showerror(title="Save Failed!",
+            message="Could not save data to file!",
+            detail="Please make sure the file isn't open and that you " +
+                "have write permission."
+        )
 
 
     def _main_done(self):
@@ -275,6 +301,15 @@ class Application(tk.Tk):
                 f'Percent Correct (Custom): {pc_custom}%'
         )
 
+        # Write any pending records before closing
+        self.csvmodel.close()
+        self.trialstore.close()
+        self.sessionpars_model.flush()
+        try:
+            self.trialstore.check()
+        except PermissionError:
+            self._save_failed()
+
         # Close app when done
         self.quit()
 
@@ -315,14 +350,26 @@ class Application(tk.Tk):
         print("\nApp_266: Calling sessionpar model set and save funcs...")
         for key, variable in self.sessionpars.items():
             self.sessionpars_model.set(key, variable.get())
-            self.sessionpars_model.save()
+        # One (debounced) write for all changed keys
+        self.sessionpars_model.save()
+
+        # Reload stimulus lists only if the lists or paths changed
+        list_key = self._list_key()
+        if list_key != self._loaded_lists:
+            # Keep retrying on later saves if no stimuli were found
+            self._loaded_lists = list_key if self.listmodel.load() else None
+            self.main_frame._load_listmodel()
 
         # Update session info labels
-        self.listmodel.load()
-        self.main_frame._load_listmodel()
         self.main_frame._update_labels()
 
 
+    def _list_key(self):
+        """ Session parameters that determine the stimulus lists """
+        return tuple(self.sessionpars[key].get() for key in 
+            ('List Number', 'Audio Files Path', 'Sentence File Path'))
+
+
     ##########################
     # Audio Dialog Functions #
     ##########################
@@ -345,23 +392,53 @@ class Application(tk.Tk):
 
     def _calc_level(self):
         """ Calculate and save adjusted presentation level
+            (after calibration). Saves all session parameters.
         """
-        # Calculate SLM offset
         print("\nApp_304: Calculating new presentation level...")
-        self.sessionpars['slm_offset'].set(self.sessionpars['slm_cal_value'].get() - self.sessionpars['raw_lvl'].get())
-        # Calculate new raw level
-        self.sessionpars['new_raw_lvl'].set(
-            self.sessionpars['new_db_lvl'].get() - self.sessionpars['slm_offset'].get())
-        print(f"New raw level: {self.sessionpars['new_raw_lvl'].get()}")
-        # Calculate new corresponding dB level
-        self.sessionpars['new_db_lvl'].set(
-            self.sessionpars['slm_offset'].get() + self.sessionpars['new_raw_lvl'].get())
-        print(f"New level (dB): {self.sessionpars['new_db_lvl'].get()}")
+        self._update_level()
 
         # Save SLM offset and updated level
         self._save_sessionpars()
 
 
+    def _update_level(self):
+        """ Per-trial level update: calculate the raw level for 
+            the current presentation level from the cached SLM 
+            offset. Lists are not reloaded and nothing is 
+            written to disk.
+        """
+        # Calculate SLM offset only when the calibration changes
+        cal_key = (self.sessionpars['slm_cal_value'].get(), 
+            self.sessionpars['raw_lvl'].get())
+        if cal_key != self._cal_key:
+            self._cal_key = cal_key
+            self._slm_offset = cal_key[0] - cal_key[1]
+            self.sessionpars['slm_offset'].set(self._slm_offset)
+            self.sessionpars_model.set('slm_offset', self._slm_offset)
+
+        # Calculate new raw level
+        new_raw_lvl = self.sessionpars['new_db_lvl'].get() - self._slm_offset
+        self.sessionpars['new_raw_lvl'].set(new_raw_lvl)
+        print(f"New raw level: {new_raw_lvl}")
+
+        # Predict clipping from the corpus index (no audio is read)
+        if new_raw_lvl > self.listmodel.min_safe_lvl:
+            clipped = self.listmodel.clipping_trials(new_raw_lvl)
+            print(f"App_363: WARNING: {len(clipped)} sentence(s) " +
+                f"will clip at {new_raw_lvl} dB FS: " +
+                f"{list(clipped['file_num'])}")
+
+        # Keep the model in step. Only marks it dirty: the file is 
+        # written by the next session/calibration save, or by 
+        # flush() when the session ends or the app closes
+        self.sessionpars_model.set('new_raw_lvl', new_raw_lvl)
+        self.sessionpars_model.set('new_db_lvl', 
+            self.sessionpars['new_db_lvl'].get())
+
+        # Update session info labels
+        self.main_frame._update_labels()
+
+
     def _play_calibration(self):
         """ Load and present calibration stimulus
         """
@@ -404,3 +481,5 @@ class Application(tk.Tk):
 if __name__ == "__main__":
     app = Application()
     app.mainloop()
+    # Close the output stream kept open during the session
+    m_engine.close_engine()
@@ -0,0 +1,362 @@
+""" Persistent audio output engine.
+
+    Keeps one output stream open for the whole session
+    instead of opening and closing a PortAudio stream for
+    every presentation (as sd.play does). Buffers are
+    handed to the stream callback through a deque, which
+    needs no lock: append and popleft are atomic. Each
+    buffer returns a Playback handle that records when
+    its first and last samples reach the output.
+
+    Each buffer is routed to the outputs by a gain matrix
+    (file channels x output channels). The callback applies
+    it with one matrix product straight into the device
+    buffer, so leveling, channel routing and conversion to
+    float take no extra copy of the signal, and the source
+    array (which may be memory-mapped integer PCM) is
+    never modified.
+
+    The 'null' backend runs the same callback on a timer
+    thread with no audio hardware, for headless machines.
+    Select it with backend='null' or by setting the
+    SNR50_AUDIO_BACKEND environment variable. sounddevice
+    is only imported when the 'sounddevice' backend opens
+    a stream.
+
+    Identical copies live in snr50gui/models and snr50/lib.
+
+    Written by: Travis M. Moore
+    Created: Oct. 18, 2026
+    Last edited: Oct. 18, 2026
+"""
+
+###########
+# Imports #
+###########
+# Import data science packages
+import numpy as np
+
+# Import system packages
+import os
+import threading
+import time
+from collections import deque
+
+
+#########
+# BEGIN #
+#########
+class Playback:
+    """ Handle for one buffer submitted to the engine.
+
+        START_TIME and END_TIME are in time.perf_counter()
+        seconds and give the estimated moments the first
+        sample and the end of the last sample reach the DAC.
+        They are None until known. STARTED and DONE are
+        threading.Events; DONE is set when the last sample
+        has been handed to the stream, which is before
+        END_TIME by the output latency.
+
+        ON_DONE, if given, is called with the handle from the
+        audio thread when DONE is set. It must not block: 
+        pass something like queue.SimpleQueue.put and act on 
+        it from the GUI thread.
+
+        A buffer dropped by stop() or by closing the stream is
+        finished too (DONE set, ON_DONE called), with DROPPED 
+        True and END_TIME the moment it was dropped.
+    """
+    def __init__(self, data, matrix, on_done=None):
+        self.data = data
+        self.matrix = matrix
+        self.on_done = on_done
+        self.pos = 0
+        self.start_time = None
+        self.end_time = None
+        self.started = threading.Event()
+        self.done = threading.Event()
+        self.dropped = False
+
+
+    def _finish(self, end_time, dropped=False):
+        """ Mark the buffer finished and call ON_DONE """
+        self.end_time = end_time
+        self.dropped = dropped
+        self.done.set()
+        if self.on_done is not None:
+            self.on_done(self)
+
+
+    def remaining(self):
+        """ Seconds until the end of the last sample reaches 
+            the DAC (0 if already past), or None if the buffer 
+            has not finished yet.
+        """
+        if not self.done.is_set():
+            return None
+        return max(0.0, self.end_time - time.perf_counter())
+
+
+    def wait(self, timeout=None):
+        """ Block until the end of the last sample has reached 
+            the DAC. Returns False on timeout.
+        """
+        if not self.done.wait(timeout):
+            return False
+        time.sleep(self.remaining())
+        return True
+
+
+def routing_matrix(nin, mapping, nout, gains=1.0):
+    """ Return the NIN x NOUT float32 gain matrix that routes 
+        the channels of a file to the outputs of a stream.
+
+        MAPPING lists 1-based output channels. File channel i 
+        goes to MAPPING[i]; a 1-channel file goes to every 
+        output in MAPPING; file channels beyond the end of 
+        MAPPING are dropped. Outputs may repeat (the channels 
+        are summed). GAINS (one value, or one per file 
+        channel) are folded into the matrix.
+    """
+    mapping = np.atleast_1d(np.asarray(mapping, dtype=np.intp)) - 1
+    if mapping.min() < 0 or mapping.max() >= nout:
+        raise ValueError(f"Mapping {mapping + 1} is outside the " +
+            f"{nout} channels of the stream")
+    gains = np.broadcast_to(np.asarray(gains, dtype=np.float64), (nin,))
+    matrix = np.zeros((nin, nout), dtype=np.float32)
+    if nin == 1:
+        matrix[0, mapping] = gains[0]
+    else:
+        k = min(nin, len(mapping))
+        np.add.at(matrix, (np.arange(k), mapping[:k]), gains[:k])
+    return matrix
+
+
+class _NullTime:
+    """ Stand-in for the PortAudio callback time info """
+    def __init__(self, now, dac):
+        self.currentTime = now
+        self.outputBufferDacTime = dac
+
+
+class NullStream:
+    """ Output stream with no audio hardware. Calls the
+        callback from a thread at the real-time rate and
+        discards the output (or keeps it in .recorded when
+        RECORD is True).
+    """
+    def __init__(self, samplerate, channels, callback, blocksize=0,
+            record=False, **kwargs):
+        self.samplerate = samplerate
+        self.channels = channels
+        self.callback = callback
+        self.blocksize = blocksize or 512
+        self.record = record
+        self.recorded = []
+        self.active = False
+        self._thread = None
+
+
+    @property
+    def time(self):
+        return time.perf_counter()
+
+
+    def _run(self):
+        period = self.blocksize / self.samplerate
+        outdata = np.zeros((self.blocksize, self.channels), dtype=np.float32)
+        deadline = time.perf_counter()
+        while self.active:
+            now = time.perf_counter()
+            self.callback(outdata, self.blocksize,
+                _NullTime(now, max(now, deadline)), None)
+            if self.record:
+                self.recorded.append(outdata.copy())
+            deadline += period
+            delay = deadline - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+
+
+    def start(self):
+        self.active = True
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+
+    def stop(self):
+        self.active = False
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+
+    def close(self):
+        self.stop()
+
+
+class OutputEngine:
+    """ One long-lived output stream on DEVICE with CHANNELS
+        output channels at sample rate FS.
+
+        Use play() to queue a buffer; buffers are played back
+        to back in the order they were queued.
+    """
+    def __init__(self, fs, channels=2, device=None, backend=None,
+            blocksize=0, latency='low'):
+        self.fs = int(fs)
+        self.channels = int(channels)
+        self.device = device
+        self.backend = backend or os.environ.get(
+            'SNR50_AUDIO_BACKEND', 'sounddevice')
+        self.underruns = 0
+        self._queue = deque()
+        self._current = None
+        self._flush = False
+
+        if self.backend == 'null':
+            self.stream = NullStream(samplerate=self.fs,
+                channels=self.channels, callback=self._callback,
+                blocksize=blocksize)
+        elif self.backend == 'sounddevice':
+            import sounddevice as sd
+            self.stream = sd.OutputStream(samplerate=self.fs,
+                channels=self.channels, device=device, dtype='float32',
+                blocksize=blocksize, latency=latency,
+                callback=self._callback)
+        else:
+            raise ValueError(f"Unknown audio backend: {self.backend}")
+
+        # Offset from the stream clock to time.perf_counter()
+        self._clock_offset = time.perf_counter() - self.stream.time
+        self.stream.start()
+        print(f"Audio_Engine_150: Opened {self.backend} stream: " +
+            f"{self.channels} channels at {self.fs} Hz")
+
+
+    def _callback(self, outdata, frames, timeinfo, status):
+        """ Fill OUTDATA from the queue. Runs on the audio thread. """
+        if status:
+            self.underruns += 1
+        outdata.fill(0)
+        if self._flush:
+            self._flush = False
+            self._drop_all()
+
+        dac = timeinfo.outputBufferDacTime + self._clock_offset
+        filled = 0
+        while filled < frames:
+            pb = self._current
+            if pb is None:
+                try:
+                    pb = self._queue.popleft()
+                except IndexError:
+                    break
+                self._current = pb
+                pb.start_time = dac + filled / self.fs
+                pb.started.set()
+            n = min(frames - filled, len(pb.data) - pb.pos)
+            np.matmul(pb.data[pb.pos:pb.pos+n], pb.matrix, 
+                out=outdata[filled:filled+n])
+            pb.pos += n
+            filled += n
+            if pb.pos == len(pb.data):
+                self._current = None
+                pb._finish(dac + filled / self.fs)
+
+
+    def _drop_all(self):
+        """ Finish the current buffer and everything queued 
+            without playing the rest, so nothing waits on them
+        """
+        dropped = [] if self._current is None else [self._current]
+        self._current = None
+        while True:
+            try:
+                dropped.append(self._queue.popleft())
+            except IndexError:
+                break
+        now = time.perf_counter()
+        for pb in dropped:
+            pb._finish(now, dropped=True)
+
+
+    @property
+    def time(self):
+        """ Current stream time in time.perf_counter() seconds """
+        return self.stream.time + self._clock_offset
+
+
+    def play(self, sig, mapping=None, gains=1.0, matrix=None, 
+            on_done=None):
+        """ Queue SIG for playback and return its Playback handle.
+
+            SIG is samples x channels (or 1-D for one channel),
+            of any numeric dtype; it is read, not copied. 
+            MAPPING lists 1-based output channels, as in 
+            sd.play (default 1, 2, ...), and GAINS scales each 
+            channel; see routing_matrix. Alternatively, pass a 
+            full channels x outputs gain MATRIX. ON_DONE is 
+            passed to the Playback handle.
+        """
+        data = np.asarray(sig)
+        if data.ndim == 1:
+            data = data[:, np.newaxis]
+        if matrix is None:
+            if mapping is None:
+                mapping = range(1, data.shape[1] + 1)
+            matrix = routing_matrix(data.shape[1], mapping, 
+                self.channels, gains)
+        else:
+            matrix = np.asarray(matrix, dtype=np.float32)
+            if matrix.shape != (data.shape[1], self.channels):
+                raise ValueError("Gain matrix must be " +
+                    f"{data.shape[1]} x {self.channels}")
+        pb = Playback(data, matrix, on_done)
+        self._queue.append(pb)
+        return pb
+
+
+    def stop(self):
+        """ Drop the current buffer and everything queued """
+        self._flush = True
+
+
+    def close(self):
+        """ Close the stream. Buffers still queued are dropped
+            (and finished; see Playback).
+        """
+        self.stream.stop()
+        self.stream.close()
+        self._drop_all()
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_engine(fs, channels=2, device=None, backend=None):
+    """ Return the shared engine, opening it on first use and
+        reopening it when the sample rate, device or backend
+        changes, or when more output channels are needed.
+    """
+    global _engine
+    backend = backend or os.environ.get('SNR50_AUDIO_BACKEND',
+        'sounddevice')
+    with _engine_lock:
+        e = _engine
+        if (e is None or e.fs != int(fs) or e.device != device
+                or e.backend != backend or e.channels < channels):
+            if e is not None:
+                e.close()
+            _engine = OutputEngine(fs, channels, device, backend)
+        return _engine
+
+
+def close_engine():
+    """ Close the shared engine, if open """
+    global _engine
+    with _engine_lock:
+        if _engine is not None:
+            _engine.close()
+            _engine = None
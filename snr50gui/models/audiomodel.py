@@ -15,17 +15,106 @@ import numpy as np
 
 # Import system packages
 import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 
 # Import audio packages
-import sounddevice as sd
 from scipy.io import wavfile
 
+# Import custom modules
+from models import audioengine
+from models import packmodel
+from models import unitconv
+
 
 
 
 #########
 # BEGIN #
 #########
+class AudioCache:
+    """ Process-wide cache of decoded .wav files. Stores the 
+        sample rate, the original samples and the float 
+        working buffer for each file, so repeated sessions 
+        over the same corpus read and convert each file once.
+
+        Entries are keyed on the absolute file path and are 
+        invalidated when the file's modification time or size 
+        changes. Cached arrays are read-only. When the total 
+        size would exceed MAX_BYTES, the least recently used 
+        files are evicted.
+    """
+    def __init__(self, max_bytes=512 * 2**20):
+        self.max_bytes = int(max_bytes)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+
+    @staticmethod
+    def _stamp(file_path):
+        """ Return the absolute path and (mtime, size) of a file.
+            Raises FileNotFoundError if the file does not exist.
+        """
+        stat = os.stat(file_path)
+        return os.path.abspath(file_path), (stat.st_mtime_ns, stat.st_size)
+
+
+    def get(self, file_path):
+        """ Return the cached (fs, original, working) tuple for 
+            FILE_PATH, or None if it is not cached or is stale.
+        """
+        key, stamp = self._stamp(file_path)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != stamp:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+
+    def put(self, file_path, fs, original, working):
+        """ Store decoded audio for FILE_PATH. The arrays are 
+            made read-only.
+        """
+        key, stamp = self._stamp(file_path)
+        original.flags.writeable = False
+        working.flags.writeable = False
+        nbytes = original.nbytes
+        if working is not original:
+            nbytes += working.nbytes
+
+        with self._lock:
+            if key in self._entries:
+                self.nbytes -= self._entries.pop(key)[2]
+            # Do not flush the whole cache for one oversized file
+            if nbytes > self.max_bytes:
+                return
+            self._entries[key] = (stamp, (fs, original, working), nbytes)
+            self.nbytes += nbytes
+            while self.nbytes > self.max_bytes:
+                _, (_, _, size) = self._entries.popitem(last=False)
+                self.nbytes -= size
+                self.evictions += 1
+
+
+    def clear(self):
+        """ Remove all cached files """
+        with self._lock:
+            self._entries.clear()
+            self.nbytes = 0
+
+
+# Shared by every Audio object in the process
+audio_cache = AudioCache()
+
+
 class Audio:
     """ An object for use with .wav files. Audio objects 
         can read a given .wav file, handle audio data type 
@@ -40,16 +129,51 @@ class Audio:
         'uint8': (0, 255)
     }
 
-    def __init__(self, file_path, level):
+    # Memory-mapped reader mode is opt-in (off by default): set 
+    # True here, or pass mmap=True per object, to map the PCM 
+    # data and convert to float block by block instead of 
+    # decoding the whole file up front
+    use_mmap = False
+
+    # Frames per block for lazy float conversion
+    blocksize = 2**16
+
+    # Working data type kept through conversion, leveling and 
+    # playback. RMS is always accumulated in float64.
+    dtype = np.dtype(np.float32)
+
+    def __init__(self, file_path, level, mmap=None, dtype=None, rms=None):
         # Parse file path
         self.directory = file_path.split(os.sep) # path only
         self.name = str(file_path.split(os.sep)[-1]) # file name only
         self.file_path = file_path
         self.level = level
-
-        # Read audio file
+        self.channel_rms = None
+        self.mmap = self.use_mmap if mmap is None else mmap
+        if dtype is not None:
+            self.dtype = np.dtype(dtype)
+        self._working = None
+
+        # Sentences in a corpus pack are a slice of one memory map 
+        # (see packmodel); no file is opened
+        packed = packmodel.find(self.file_path)
+
+        # Read audio file (decoded audio is shared through audio_cache;
+        # memory-mapped and packed files are not decoded, so are not 
+        # cached)
         try:
-            fs, audio_file = wavfile.read(self.file_path)
+            cached = None
+            if packed is not None:
+                fs, audio_file = packed
+            elif not self.mmap:
+                cached = audio_cache.get(self.file_path)
+            # A cached buffer in another working dtype is a miss
+            if cached is not None and cached[2].dtype != self.dtype:
+                cached = None
+            if cached is not None:
+                fs, audio_file, working = cached
+            elif packed is None:
+                fs, audio_file = wavfile.read(self.file_path, mmap=self.mmap)
         except FileNotFoundError:
             print("Audio_Model_47: Audio file not found!")
             raise FileNotFoundError
@@ -62,65 +186,142 @@ class Audio:
             self.channels = 1
         print(f"\nNumber of channels: {self.channels}")
 
+        # Per-channel RMS from the corpus index (see corpusmodel), 
+        # so measure() need not scan the samples
+        if rms is not None:
+            self.channel_rms = np.asarray(rms, dtype=np.float64)
+            if self.channels == 1:
+                self.channel_rms = self.channel_rms.reshape(())
+
         # Assign audio file attributes
         self.fs = fs
         self.original_audio = audio_file
         self.dur = len(self.original_audio) / self.fs
-        self.t = np.arange(0, self.dur, 1/self.fs)
 
         # Get data type
         #self.data_type = np.dtype(audio_file[0])
         self.data_type = audio_file.dtype
         print(f"Incoming audio data type: {self.data_type}")
 
-        # Immediately convert to float64 for processing
-        self.convert_to_float()
+        # Immediately convert to the working dtype for processing
+        # (memory-mapped files are converted lazily)
+        if cached is not None:
+            self.working_audio = working
+        elif not self.mmap:
+            self.convert_to_float()
+            if packed is None:
+                audio_cache.put(self.file_path, fs, self.original_audio, 
+                    self.working_audio)
+
+
+    @property
+    def working_audio(self):
+        """ Audio for processing, in the working dtype (float32 
+            by default; see Audio.dtype). For memory-mapped files 
+            the whole file is converted on first access; measure() 
+            and play() avoid this by working block by block.
+        """
+        if self._working is None:
+            self.convert_to_float()
+        return self._working
+
+
+    @working_audio.setter
+    def working_audio(self, sig):
+        self._working = sig
+
+
+    def _scale(self):
+        """ Factor that converts original samples to float """
+        if self.data_type in ('float32', 'float64'):
+            return 1.0
+        return 1.0 / self.wav_dict[str(self.data_type)][1]
 
 
     def convert_to_float(self):
-        """ Convert original audio data type to float64 
-            for processing
+        """ Convert original audio data type to the working 
+            dtype (float32 by default) for processing
         """
-        if self.data_type == 'float64':
+        if self.data_type == self.dtype:
             self.working_audio = self.original_audio
         else:
-            # 1. Convert to float64
-            sig = self.original_audio.astype(np.float64)
-            # 2. Divide by original dtype max val
-            sig = sig / self.wav_dict[str(self.data_type)][1]
-            self.working_audio = sig
+            # Convert and divide by original dtype max val 
+            # in a single pass
+            self.working_audio = np.multiply(self.original_audio, 
+                self._scale(), dtype=self.dtype)
 
 
-    def play(self, device_id, channels):
-        """ Present working audio """
+    def blocks(self):
+        """ Yield the working audio in blocks of self.blocksize 
+            frames. Memory-mapped files are converted to float64 
+            one block at a time.
+        """
+        if self._working is not None:
+            sig, scale = self._working, 1.0
+        else:
+            sig, scale = self.original_audio, self._scale()
+        for start in range(0, len(sig), self.blocksize):
+            block = sig[start:start+self.blocksize]
+            if scale != 1.0 or not np.issubdtype(block.dtype, np.floating):
+                block = np.multiply(block, scale, dtype=np.float64)
+            yield block
+
+
+    def measure(self):
+        """ Return the RMS of each channel of the working audio,
+            accumulated in float64 whatever the working dtype.
+            Computed once per object (e.g., by the Prefetcher) 
+            so that only the gain is applied at presentation.
+        """
+        if self.channel_rms is None:
+            sumsq = sum(np.einsum('i...,i...->...', block, block, 
+                dtype=np.float64) for block in self.blocks())
+            self.channel_rms = np.sqrt(sumsq / len(self.original_audio))
+        return self.channel_rms
+
+
+    def play(self, device_id, channels, on_done=None):
+        """ Present working audio on the session's output engine.
+            CHANNELS is a speaker number or a list of them (one 
+            per file channel; a 1-channel file plays from every 
+            listed speaker). Returns the engine's Playback 
+            handle. ON_DONE is called from the audio thread 
+            when playback finishes.
+        """
         #print(f"Presenting audio data type: {np.dtype(self.working_audio[0])}")
-        print(f"Presenting audio data type: {self.working_audio.dtype}")
-        # plt.subplot(1,3,1)
-        # plt.plot(self.original_audio)
-        # plt.subplot(1,3,2)
-        # plt.plot(self.working_audio)
-
-        sd.default.device = device_id
-
-        if self.channels == 1:
-            sig = self.setRMS(self.working_audio, self.level)
-            self.working_audio = sig
-        elif self.channels > 1:
-            left = self.setRMS(self.working_audio[:,0], self.level)
-            right = self.setRMS(self.working_audio[:,1], self.level)
-            self.working_audio = np.array([left, right])
-        # plt.subplot(1,3,3)
-        # plt.plot(self.working_audio)
-        # plt.show()
+        if self._working is not None:
+            print(f"Presenting audio data type: {self._working.dtype}")
+
+        # Gain to bring each channel to self.level. Silent 
+        # channels are left alone.
+        with np.errstate(divide='ignore'):
+            rmsdb = self.mag2db(self.measure())
+        gains = self.db2mag(np.where(np.isfinite(rmsdb), self.level - rmsdb, 0))
+
+        # Leveling and routing to the speakers happen in one pass 
+        # into the device buffer; working_audio is left untouched, 
+        # so repeated plays are identical. Memory-mapped files are 
+        # converted from the original samples as they are played.
+        if self._working is None:
+            sig = self.original_audio
+            gains = gains * self._scale()
+        else:
+            sig = self._working
 
-        sd.play(self.working_audio.T, self.fs, mapping=channels)
-        #sd.wait(self.dur+0.5)
+        # One stream stays open across trials; it is only 
+        # reopened if the device or sample rate changes
+        engine = audioengine.get_engine(self.fs, 
+            channels=int(np.max(channels)), device=device_id)
+        return engine.play(sig, mapping=channels, gains=gains, 
+            on_done=on_done)
 
 
     def convert_to_original(self):
         """ Convert back to original audio data type """
-        # 1. Multiply float64 by original data type max
-        sig = self.working_audio * self.wav_dict[str(self.data_type)][1]
+        # 1. Multiply by original data type max (in float64, 
+        # which holds every int32 value exactly)
+        sig = np.multiply(self.working_audio, 
+            self.wav_dict[str(self.data_type)][1], dtype=np.float64)
         if self.data_type != 'float32':
             # 2. Round to return to integer values
             sig = np.round(sig)
@@ -130,54 +331,33 @@ class Audio:
         self.working_audio = sig
 
 
-    @staticmethod
-    def db2mag(db):
-        """ 
-            Convert decibels to magnitude. Takes a single
-            value or a list of values.
-        """
-        # Must use this form to handle negative db values!
-        try:
-            mag = [10**(x/20) for x in db]
-            return mag
-        except:
-            mag = 10**(db/20)
-            return mag
-
-
-    @staticmethod
-    def mag2db(mag):
-        """ 
-            Convert magnitude to decibels. Takes a single
-            value or a list of values.
-        """
-        try:
-            db = [20 * np.log10(x) for x in mag]
-            return db
-        except:
-            db = 20 * np.log10(mag)
-            return db
+    # Unit conversions (ufunc-based; see models/unitconv.py)
+    db2mag = staticmethod(unitconv.db2mag)
+    mag2db = staticmethod(unitconv.mag2db)
 
 
     def rms(self, sig):
         """ 
             Calculate the root mean square of a signal. 
             
-            NOTE: np.square will return invalid, negative 
-                results if the number excedes the bit 
-                depth. In these cases, convert to int64
-                EXAMPLE: sig = np.array(sig,dtype=int)
+            NOTE: the sum of squares is accumulated in 
+                float64, so float32 and integer signals 
+                neither lose precision nor overflow.
 
             Written by: Travis M. Moore
-            Last edited: Feb. 3, 2020
+            Last edited: Oct. 18, 2026
         """
-        theRMS = np.sqrt(np.mean(np.square(sig)))
+        flat = np.ravel(sig)
+        sumsq = np.einsum('i,i->', flat, flat, dtype=np.float64)
+        theRMS = np.sqrt(sumsq / flat.size)
         return theRMS
 
 
     def setRMS(self, sig, amp, eq='n'):
         """
             Set RMS level of a 1-channel or 2-channel signal.
+            The result keeps the data type of SIG (the gain 
+            is computed in float64).
         
             SIG: a 1-channel or 2-channel signal
             AMP: the desired amplitude to be applied to 
@@ -197,64 +377,76 @@ class Audio:
 
             Written by: Travis M. Moore
             Created: Jan. 10, 2022
-            Last edited: May 17, 2022
+            Last edited: Oct. 18, 2026
         """
-        #amp = self.level
-        #sig = self.working_audio
         if len(sig.shape) == 1:
-            rmsdb = self.mag2db(self.rms(sig))
-            refdb = amp
-            diffdb = np.abs(rmsdb - refdb)
-            if rmsdb > refdb:
-                sigAdj = sig / self.db2mag(diffdb)
-            elif rmsdb < refdb:
-                sigAdj = sig * self.db2mag(diffdb)
-            # Edit 5/17/22
-            # Added handling for when rmsdb == refdb
-            elif rmsdb == refdb:
-                sigAdj = sig
-            return sigAdj
-            
+            gaindb = amp - self.mag2db(self.rms(sig))
         elif len(sig.shape) == 2:
-            rmsdbLeft = self.mag2db(self.rms(sig[0]))
-            rmsdbRight = self.mag2db(self.rms(sig[1]))
-
-            ILD = np.abs(rmsdbLeft - rmsdbRight) # get lvl diff
-
-            # Determine lvl advantage
-            if rmsdbLeft > rmsdbRight:
-                lvlAdv = 'left'
-                #print("Adv: %s" % lvlAdv)
-            elif rmsdbRight > rmsdbLeft:
-                lvlAdv = 'right'
-                #print("Adv: %s" % lvlAdv)
-            elif rmsdbLeft == rmsdbRight:
-                lvlAdv = None
-
-            #refdb = amp - 3 # apply half amp to each channel
-            refdb = amp
-            diffdbLeft = np.abs(rmsdbLeft - refdb)
-            diffdbRight = np.abs(rmsdbRight - refdb)
-
-            # Adjust left channel
-            if rmsdbLeft > refdb:
-                sigAdjLeft = sig[0] / self.db2mag(diffdbLeft)
-            elif rmsdbLeft < refdb:
-                sigAdjLeft = sig[0] * self.db2mag(diffdbLeft)
-            # Adjust right channel
-            if rmsdbRight > refdb:
-                sigAdjRight = sig[1] / self.db2mag(diffdbRight)
-            elif rmsdbRight < refdb:
-                sigAdjRight = sig[1] * self.db2mag(diffdbRight)
-
-            # If there is a lvl difference to maintain across channels
+            if sig.shape[0] != 2:
+                raise ValueError("setRMS takes a 1-channel or " +
+                    f"2-channel signal, not {sig.shape[0]} channels")
+            rmsdb = self.mag2db(np.array([self.rms(sig[0]), self.rms(sig[1])]))
             if eq == 'n':
-                if lvlAdv == 'left':
-                    sigAdjLeft = sigAdjLeft * self.db2mag(ILD/2)
-                    sigAdjRight = sigAdjRight / self.db2mag(ILD/2)
-                elif lvlAdv == 'right':
-                    sigAdjLeft = sigAdjLeft / self.db2mag(ILD/2)
-                    sigAdjRight = sigAdjRight * self.db2mag(ILD/2)
-
-            sigBothAdj = np.array([sigAdjLeft, sigAdjRight])
-            return sigBothAdj
+                # One gain for both channels keeps the ILD, 
+                # centred on AMP
+                gaindb = amp - np.mean(rmsdb)
+            else:
+                gaindb = (amp - rmsdb)[:, np.newaxis]
+        else:
+            raise ValueError("setRMS takes a 1-channel or " +
+                f"2-channel signal, not a {sig.ndim}-D array")
+
+        gain = self.db2mag(gaindb)
+        if np.issubdtype(sig.dtype, np.floating):
+            gain = np.asarray(gain, dtype=sig.dtype)
+        return sig * gain
+
+
+class Prefetcher:
+    """ Decode upcoming audio files on a worker thread, so the 
+        file read, float conversion and RMS measurement for the 
+        next trial happen while the current trial is scored. 
+        Only the gain is left to apply at presentation.
+    """
+    def __init__(self):
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self._pending = {}
+
+
+    @staticmethod
+    def _load(file_path, rms=None):
+        """ Decode and measure a file (runs on the worker thread).
+            RMS, if known from the corpus index, skips the scan.
+        """
+        audio = Audio(file_path, None, rms=rms)
+        audio.measure()
+        return audio
+
+
+    def prefetch(self, file_path, rms=None):
+        """ Start decoding FILE_PATH in the background """
+        if file_path not in self._pending:
+            self._pending[file_path] = self._executor.submit(
+                self._load, file_path, rms)
+
+
+    def get(self, file_path, level, rms=None):
+        """ Return an Audio object for FILE_PATH at LEVEL. Waits 
+            for a pending prefetch, or loads the file now if it 
+            was never prefetched. Errors from the worker (e.g., 
+            FileNotFoundError) are raised here.
+        """
+        future = self._pending.pop(file_path, None)
+        if future is None:
+            audio = self._load(file_path, rms)
+        else:
+            audio = future.result()
+        audio.level = level
+        return audio
+
+
+    def clear(self):
+        """ Forget pending prefetches (e.g., after a list change) """
+        for future in self._pending.values():
+            future.cancel()
+        self._pending.clear()
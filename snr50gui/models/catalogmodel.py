@@ -0,0 +1,214 @@
+""" Catalog of a sentence corpus: list number to sentences
+    and audio files.
+
+    The catalog is built once per pair of sentence and audio
+    directories. It reads the sentence .csv file and numbers
+    the audio files (from the corpus pack index, if there is
+    one, and the .wav file names), then stores,
+    for each list number, the sentences in that list:
+        [csv row, sentence number, sentence, audio file name]
+    The audio file name is None if the sentence has no audio
+    file.
+
+    Catalogs are cached in the user's home directory
+    (snr50_catalog.json), keyed on the two directories. A
+    cached catalog is used as long as neither directory's
+    modification time has changed and the sentence file's
+    modification time and size are unchanged. Selecting
+    lists is then a lookup of the requested list numbers,
+    with no globbing or .csv parsing.
+
+    Written by: Travis M. Moore
+    Created: Oct. 18, 2026
+    Last edited: Oct. 18, 2026
+"""
+
+###########
+# Imports #
+###########
+# Import data science packages
+import pandas as pd
+
+# Import system packages
+import json
+import os
+import threading
+from glob import glob
+from pathlib import Path
+
+# Import custom modules
+from models import packmodel
+
+
+#########
+# BEGIN #
+#########
+CACHE_PATH = Path.home() / 'snr50_catalog.json'
+
+
+def _key(sentence_dir, audio_dir):
+    """ Cache key for a pair of directories """
+    return os.path.abspath(sentence_dir) + '|' + os.path.abspath(audio_dir)
+
+
+def _stamp(sentence_dir, audio_dir, sentence_file):
+    """ Modification times that invalidate a catalog. None for
+        a path that does not exist.
+    """
+    stamp = []
+    for path in (sentence_dir, audio_dir):
+        try:
+            stamp.append(os.stat(path).st_mtime_ns)
+        except (FileNotFoundError, NotADirectoryError):
+            stamp.append(None)
+    try:
+        stat = os.stat(sentence_file)
+        stamp.extend([stat.st_mtime_ns, stat.st_size])
+    except (FileNotFoundError, NotADirectoryError, TypeError):
+        stamp.extend([None, None])
+    return stamp
+
+
+class Catalog:
+    """ Sentences and audio files of one corpus, by list number """
+    def __init__(self, sentence_dir, audio_dir, sentence_file,
+            csv_count, stamp, lists):
+        self.sentence_dir = sentence_dir
+        self.audio_dir = audio_dir
+        self.sentence_file = sentence_file
+        self.csv_count = csv_count
+        self.stamp = stamp
+        self.lists = lists
+
+
+    @classmethod
+    def build(cls, sentence_dir, audio_dir):
+        """ Read the sentence file and number the audio files.
+            Raises FileNotFoundError if there is no sentence
+            file. A missing audio directory gives a catalog
+            with no audio files.
+        """
+        sentence_files = glob(os.path.join(sentence_dir, '*.csv'))
+        if not sentence_files:
+            raise FileNotFoundError(f"No sentence file in {sentence_dir}")
+        sentence_file = os.path.abspath(sentence_files[0])
+        # Stamp before reading, so a change made while building
+        # invalidates the catalog
+        stamp = _stamp(sentence_dir, audio_dir, sentence_file)
+
+        # Audio file names by sentence number: the sentences in 
+        # the corpus pack (which may be used without its .wav 
+        # files), plus every numbered .wav file, so files added 
+        # after packing are included
+        pack = packmodel.open_pack(audio_dir)
+        names = {}
+        if pack is not None:
+            names = {num: f"{num}.wav" for num in pack.sentence_nums()}
+        for file_path in glob(os.path.join(audio_dir, '*.wav')):
+            name = os.path.basename(file_path)
+            stem = os.path.splitext(name)[0]
+            if stem.isdigit():
+                names[int(stem)] = name
+            else:
+                print(f"Models_Catalog_108: Skipping {file_path} " +
+                    "(not numbered)")
+
+        # Sentences by list number, in file order
+        s = pd.read_csv(sentence_file)
+        lists = {}
+        for row, list_num, sentence_num, sentence in zip(range(len(s)),
+                s['list_num'], s['sentence_num'], s['sentence']):
+            lists.setdefault(int(list_num), []).append([row,
+                int(sentence_num), sentence, names.get(int(sentence_num))])
+
+        print(f"Models_Catalog_119: Cataloged {len(s)} sentences in " +
+            f"{len(lists)} lists ({len(names)} audio files)")
+        return cls(sentence_dir, audio_dir, sentence_file,
+            len(sentence_files), stamp, lists)
+
+
+    def fresh(self):
+        """ True if neither directory nor the sentence file has
+            changed since the catalog was built
+        """
+        return self.stamp == _stamp(self.sentence_dir, self.audio_dir,
+            self.sentence_file)
+
+
+    def rows(self, list_nums):
+        """ Return the sentences in LIST_NUMS, in sentence file
+            order, as (csv row, list number, sentence number,
+            sentence, audio path) tuples. The audio path is None
+            if the sentence has no audio file. Unknown list
+            numbers are skipped.
+        """
+        rows = []
+        for list_num in set(list_nums):
+            for row, sentence_num, sentence, name in self.lists.get(list_num, ()):
+                path = None if name is None else os.path.join(self.audio_dir, name)
+                rows.append((row, list_num, sentence_num, sentence, path))
+        rows.sort()
+        return rows
+
+
+    def to_dict(self):
+        return {'sentence_file': self.sentence_file,
+            'csv_count': self.csv_count, 'stamp': self.stamp,
+            'lists': self.lists}
+
+
+_catalogs = {}
+_catalogs_lock = threading.Lock()
+
+
+def _read_cache():
+    """ All cached catalogs, or {} if the cache is missing or
+        unreadable
+    """
+    try:
+        with open(CACHE_PATH, 'r') as fh:
+            return json.load(fh)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def _write_cache(key, catalog):
+    """ Store CATALOG in the cache file. Written to a temporary
+        file and renamed, so the cache is never half written.
+    """
+    cache = _read_cache()
+    cache[key] = catalog.to_dict()
+    tmp_path = CACHE_PATH.with_name(CACHE_PATH.name + '.tmp')
+    try:
+        with open(tmp_path, 'w') as fh:
+            json.dump(cache, fh, separators=(',', ':'))
+        os.replace(tmp_path, CACHE_PATH)
+    except OSError as err:
+        print(f"Models_Catalog_170: Could not write catalog cache: {err}")
+
+
+def open_catalog(sentence_dir, audio_dir):
+    """ Return the Catalog for SENTENCE_DIR and AUDIO_DIR: from
+        memory, then from the cache file, and built (and
+        cached) only if neither is fresh.
+    """
+    key = _key(sentence_dir, audio_dir)
+    with _catalogs_lock:
+        catalog = _catalogs.get(key)
+        if catalog is None or not catalog.fresh():
+            entry = _read_cache().get(key)
+            catalog = None
+            if entry is not None:
+                catalog = Catalog(sentence_dir, audio_dir,
+                    entry['sentence_file'], entry['csv_count'],
+                    entry['stamp'],
+                    {int(num): rows for num, rows in entry['lists'].items()})
+                if catalog.fresh():
+                    print("Models_Catalog_189: Loaded cached catalog")
+                else:
+                    catalog = None
+            if catalog is None:
+                catalog = Catalog.build(sentence_dir, audio_dir)
+                _write_cache(key, catalog)
+            _catalogs[key] = catalog
+        return catalog
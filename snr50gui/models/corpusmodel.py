@@ -0,0 +1,196 @@
+""" Offline index of audio corpus statistics.
+
+    Walks a directory of .wav files once and stores the
+    per-channel RMS and peak, duration, sample rate, channel
+    count and data type of each file in a sidecar JSON file
+    (snr50_index.json) in the same directory. StimulusList
+    attaches the stored RMS to each trial, so Audio can level
+    a sentence without scanning its samples, and uses the
+    stored peaks to predict clipping before playback.
+
+    Entries are keyed on the file name and are ignored once
+    the file's modification time or size changes. Building
+    with check='hash' keeps entries whose content hash still
+    matches (e.g., after copying the corpus to a new machine,
+    which changes every modification time). Content hashes
+    are only computed and stored by hash builds, so a default
+    build reads each changed file once.
+
+    Build or refresh an index from the snr50gui folder with:
+        python -m models.corpusmodel <audio directory> [--hash]
+
+    Written by: Travis M. Moore
+    Created: Oct. 18, 2026
+    Last edited: Oct. 18, 2026
+"""
+
+###########
+# Imports #
+###########
+# Import data science packages
+import numpy as np
+
+# Import system packages
+import hashlib
+import json
+import os
+from glob import glob
+
+# Import custom modules
+from models import audiomodel
+
+
+#########
+# BEGIN #
+#########
+class CorpusIndex:
+    """ Per-file statistics for the .wav files in DIRECTORY """
+    filename = 'snr50_index.json'
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.filepath = os.path.join(directory, self.filename)
+        self.entries = {}
+        self.load()
+
+
+    def load(self):
+        """ Read the sidecar index, if there is one """
+        if not os.path.exists(self.filepath):
+            return
+        with open(self.filepath, 'r') as fh:
+            self.entries = json.load(fh)
+        print(f"Models_Corpus_58: Loaded index of {len(self.entries)} " +
+            f"files from {self.filepath}")
+
+
+    def save(self):
+        """ Write the sidecar index """
+        with open(self.filepath, 'w') as fh:
+            json.dump(self.entries, fh, separators=(',', ':'))
+
+
+    @staticmethod
+    def _stamp(file_path):
+        stat = os.stat(file_path)
+        return stat.st_mtime_ns, stat.st_size
+
+
+    @staticmethod
+    def _hash(file_path):
+        """ SHA-1 of the file contents """
+        sha = hashlib.sha1()
+        with open(file_path, 'rb') as fh:
+            for chunk in iter(lambda: fh.read(2**20), b''):
+                sha.update(chunk)
+        return sha.hexdigest()
+
+
+    @staticmethod
+    def _measure(file_path):
+        """ Return the statistics for one file, read block by
+            block from a memory map. RMS and peak are in the
+            same float units as Audio.working_audio.
+        """
+        audio = audiomodel.Audio(file_path, None, mmap=True)
+        sumsq = 0
+        peak = 0
+        for block in audio.blocks():
+            block = block.reshape(len(block), -1)
+            sumsq = sumsq + np.einsum('ij,ij->j', block, block,
+                dtype=np.float64)
+            peak = np.maximum(peak, np.max(np.abs(block), axis=0))
+        return {
+            'rms': np.sqrt(sumsq / len(audio.original_audio)).tolist(),
+            'peak': np.asarray(peak, dtype=np.float64).tolist(),
+            'dur': audio.dur,
+            'fs': int(audio.fs),
+            'channels': audio.channels,
+            'dtype': str(audio.data_type)
+        }
+
+
+    def build(self, check='mtime'):
+        """ Index every .wav file in the directory and save.
+            Fresh entries are kept; with CHECK='hash', entries
+            whose content hash is unchanged are also kept, and 
+            every entry gets a hash for later hash builds.
+            Entries for deleted files are dropped.
+        """
+        files = sorted(glob(os.path.join(self.directory, '*.wav')))
+        entries = {}
+        measured = 0
+        for file_path in files:
+            name = os.path.basename(file_path)
+            mtime, size = self._stamp(file_path)
+            entry = self.entries.get(name)
+            fresh = (entry is not None and entry['mtime_ns'] == mtime
+                and entry['size'] == size)
+            if not fresh:
+                sha1 = self._hash(file_path) if check == 'hash' else None
+                if not (sha1 is not None and entry is not None
+                        and entry.get('sha1') == sha1):
+                    entry = self._measure(file_path)
+                    measured += 1
+                entry.update(mtime_ns=mtime, size=size, sha1=sha1)
+            elif check == 'hash' and entry.get('sha1') is None:
+                entry['sha1'] = self._hash(file_path)
+            entries[name] = entry
+        self.entries = entries
+        self.save()
+        print(f"Models_Corpus_132: Indexed {len(entries)} files " +
+            f"({measured} measured)")
+
+
+    def lookup(self, file_path):
+        """ Return the index entry for FILE_PATH, or None if it
+            is not indexed or has changed since indexing.
+        """
+        entry = self.entries.get(os.path.basename(file_path))
+        if entry is None:
+            return None
+        try:
+            if self._stamp(file_path) != (entry['mtime_ns'], entry['size']):
+                return None
+        except FileNotFoundError:
+            return None
+        return entry
+
+
+    def rms(self, file_path):
+        """ Stored per-channel RMS of FILE_PATH, or None """
+        entry = self.lookup(file_path)
+        return None if entry is None else entry['rms']
+
+
+    def max_safe_level(self, file_path):
+        """ Highest raw level (dB FS RMS, as passed to Audio) at 
+            which FILE_PATH plays without clipping, or None if 
+            the file is not indexed. Each channel is leveled to 
+            the target on its own, so a channel clips once the 
+            target exceeds its RMS minus its peak (in dB); the 
+            file is limited by its worst channel. Silent 
+            channels are not scaled and never clip.
+        """
+        entry = self.lookup(file_path)
+        if entry is None:
+            return None
+        rms = np.asarray(entry['rms'])
+        peak = np.asarray(entry['peak'])
+        voiced = (rms > 0) & (peak > 0)
+        if not np.any(voiced):
+            return np.inf
+        crest = audiomodel.unitconv.mag2db(peak[voiced] / rms[voiced])
+        return float(-np.max(crest))
+
+
+if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(
+        description="Index the .wav files in an audio directory")
+    parser.add_argument('directory')
+    parser.add_argument('--hash', action='store_true',
+        help="keep entries whose content is unchanged, even if the " +
+        "modification time differs")
+    args = parser.parse_args()
+    CorpusIndex(args.directory).build(check='hash' if args.hash else 'mtime')
@@ -8,7 +8,10 @@ import tkinter
 from tkinter import messagebox
 
 # Import system packages
+import atexit
 import csv
+import queue
+import threading
 from pathlib import Path
 from datetime import datetime
 import os
@@ -19,19 +22,39 @@ import os
 #########
 class CSVModel:
     """ Write provided dictionary to .csv
+
+        The data file is opened once per session and records
+        are written by a background thread, so disk latency
+        never holds up the GUI. Each record is flushed to the
+        operating system as soon as it is written, so a crash
+        of the app loses nothing that was handed to the
+        writer. FSYNC_EVERY sets how often records are also
+        forced to disk (to survive a power loss): 1 for every
+        trial, N for every N trials, or 0 for only on close.
     """
-    def __init__(self, sessionpars):
+    def __init__(self, sessionpars, fsync_every=1, maxsize=256):
         self.sessionpars = sessionpars
+        self.fsync_every = fsync_every
 
         # Generate date stamp
         self.datestamp = datetime.now().strftime("%Y_%b_%d_%H%M")
 
+        # Writer state (opened on the first record)
+        self.file = None
+        self._fh = None
+        self._csvwriter = None
+        self._queue = queue.Queue(maxsize=maxsize)
+        self._thread = None
+        self._error = None
+        atexit.register(self.close)
 
-    def save_record(self, data):
-        """ Save a dictionary of data to .csv file 
+
+    def _open(self, filename):
+        """ Open FILENAME for appending and start the writer
+            thread. Raises PermissionError if it cannot be
+            written.
         """
-        # Create file name and path
-        filename = f"{self.datestamp}_{self.sessionpars['Condition'].get()}_{self.sessionpars['Subject'].get()}.csv"
+        self.close()
         self.file = Path(filename)
 
         # Check for write access to store csv
@@ -45,11 +68,78 @@ class CSVModel:
             msg = f"Permission denied accessing file: {filename}"
             raise PermissionError(msg)
 
-        # Write data to file
-        newfile = not self.file.exists()
-        with open(self.file, 'a', newline='') as fh:
-            csvwriter = csv.DictWriter(fh, fieldnames=data.keys())
-            if newfile:
-                csvwriter.writeheader()
-            csvwriter.writerow(data)
-        print("Models_csvmodel_52:Record successfully saved!")
+        self._newfile = not file_exists or self.file.stat().st_size == 0
+        self._fh = open(self.file, 'a', newline='')
+        self._csvwriter = None
+        # Daemon thread: the atexit hook closes it cleanly
+        self._thread = threading.Thread(target=self._run,
+            name='CSVModel writer', daemon=True)
+        self._thread.start()
+
+
+    def _run(self):
+        """ Write queued records (runs on the writer thread) """
+        count = 0
+        while True:
+            data = self._queue.get()
+            try:
+                if data is None:
+                    break
+                if self._csvwriter is None:
+                    self._csvwriter = csv.DictWriter(self._fh,
+                        fieldnames=data.keys())
+                    if self._newfile:
+                        self._csvwriter.writeheader()
+                self._csvwriter.writerow(data)
+                self._fh.flush()
+                count += 1
+                if self.fsync_every and count % self.fsync_every == 0:
+                    os.fsync(self._fh.fileno())
+            except (OSError, ValueError) as err:
+                self._error = err
+                print(f"Models_csvmodel_96: Could not write record: {err}")
+            finally:
+                self._queue.task_done()
+
+        # Closing: force everything to disk
+        self._fh.flush()
+        os.fsync(self._fh.fileno())
+        self._fh.close()
+
+
+    def save_record(self, data):
+        """ Save a dictionary of data to .csv file
+        """
+        # Create file name and path
+        filename = f"{self.datestamp}_{self.sessionpars['Condition'].get()}_{self.sessionpars['Subject'].get()}.csv"
+        if self._thread is None or self.file != Path(filename):
+            self._open(filename)
+
+        # Report a failure from an earlier background write
+        if self._error is not None:
+            err, self._error = self._error, None
+            raise PermissionError(f"Could not write to {self.file}: {err}")
+
+        # Hand a copy to the writer thread
+        self._queue.put(dict(data))
+        print("Models_csvmodel_52:Record sent to writer!")
+
+
+    def flush(self):
+        """ Block until every queued record has been written and
+            forced to disk.
+        """
+        if self._thread is None:
+            return
+        self._queue.join()
+        os.fsync(self._fh.fileno())
+
+
+    def close(self):
+        """ Write any queued records, sync and close the file """
+        if self._thread is None:
+            return
+        self._queue.put(None)
+        self._thread.join()
+        self._thread = None
+        self._fh = None
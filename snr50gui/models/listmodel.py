@@ -14,7 +14,10 @@ import pandas as pd
 
 # Import system packages
 import os
-from glob import glob
+
+# Import custom modules
+from models import catalogmodel
+from models import corpusmodel
 
 
 #########
@@ -33,15 +36,23 @@ class StimulusList:
         # Initialize
         self.sessionpars = sessionpars
 
+        # Lowest clipping limit of any indexed sentence in the 
+        # loaded lists (NaN if unknown)
+        self.min_safe_lvl = float('nan')
+
 
     def load(self):
         """ Controller to call task functions 
-            in the proper order.
+            in the proper order. Returns True if sentences 
+            and audio files were found for the lists.
         """
         # Retrieve specified list number(s)
         self._get_list_nums()
 
         try:
+            # Look up the corpus catalog
+            # Must occur before sentence and audio calls
+            self._get_catalog()
             # Load and subset sentences
             # Must occur before audio call
             self._get_sentences()
@@ -50,6 +61,8 @@ class StimulusList:
             self._get_audio_files()
         except FileNotFoundError:
             print("Models_Listmodel_52: Cannot find stimuli!")
+            return False
+        return len(self.sentence_df) > 0 and len(self.audio_df) > 0
 
 
     def _get_list_nums(self):
@@ -59,12 +72,14 @@ class StimulusList:
         self.lists = [int(val) for val in self.lists]
 
 
-    #############
-    # Sentences #
-    #############
-    def _get_sentences(self):
-        """ Open sentences file and load contents into dataframe. 
-            Subset by specified list number(s) from session info.
+    ###########
+    # Catalog #
+    ###########
+    def _get_catalog(self):
+        """ Get the catalog of sentences and audio files for the 
+            sentence and audio directories (built on first use 
+            and whenever either directory changes). Look up the 
+            rows for the specified list number(s).
         """
         # Check whether sentence directory exists
         print("Models_listmodel_66: Checking for sentences dir...")
@@ -77,21 +92,37 @@ class StimulusList:
             #)
             raise FileNotFoundError
 
-        # If a valid directory has been given, 
-        # get a list of sentence files
-        glob_pattern = os.path.join(self.sessionpars['Sentence File Path'].get(), '*.csv')
-        sentence_file = glob(glob_pattern)
+        # Check whether audio directory exists
+        print("Models_listmodel_102: Checking for audio files dir...")
+        if not os.path.exists(self.sessionpars['Audio Files Path'].get()):
+            print("Models_listmodel_104: Not a valid audio files directory!")
+            messagebox.showerror(
+                title='Directory Not Found!',
+                message="Cannot find the audio file directory!\n" +
+                "Please choose another file path."
+            )
+
+        catalog = catalogmodel.open_catalog(
+            self.sessionpars['Sentence File Path'].get(),
+            self.sessionpars['Audio Files Path'].get())
         # Check to make sure there's only one file in the directory
-        if len(sentence_file) > 1:
+        if catalog.csv_count > 1:
             messagebox.showwarning(
                 title="Too Many Files!",
                 message="Multiple sentence files found - taking the first one."
             )
-        # Read sentence file into dataframe
-        s = pd.read_csv(sentence_file[0])
+        self.rows = catalog.rows(self.lists)
 
-        # Get sentences for specified list numbers
-        self.sentence_df = s.loc[s['list_num'].isin(self.lists)].reset_index()
+
+    #############
+    # Sentences #
+    #############
+    def _get_sentences(self):
+        """ Load sentences for the specified list number(s) 
+            into a dataframe, in sentence file order.
+        """
+        self.sentence_df = pd.DataFrame([row[:4] for row in self.rows],
+            columns=['index', 'list_num', 'sentence_num', 'sentence'])
         print(self.sentence_df)
         print("Models_listmodel_91: Sentence list dataframe loaded into listmodel")
 
@@ -103,29 +134,62 @@ class StimulusList:
         """ Load in files as full paths. Select files based 
             on sentences data frame.
         """
-        # Check whether audio directory exists
-        print("Models_listmodel_102: Checking for audio files dir...")
-        if not os.path.exists(self.sessionpars['Audio Files Path'].get()):
-            print("Models_listmodel_104: Not a valid audio files directory!")
-            messagebox.showerror(
-                title='Directory Not Found!',
-                message="Cannot find the audio file directory!\n" +
-                "Please choose another file path."
-            )
-
-        # If a valid directory has been given, 
-        # get the audio file paths and names
-        glob_pattern = os.path.join(self.sessionpars['Audio Files Path'].get(), '*.wav')
-        # Create audio paths dataframe
-        self.audio_df = pd.DataFrame(glob(glob_pattern), columns=['path'])
-        # Create new column based on file names (which are numbered)
-        self.audio_df['file_num'] = self.audio_df['path'].apply(lambda x: x.split(os.sep)[-1][:-4])
-        # Convert to integers
-        self.audio_df['file_num'] = self.audio_df['file_num'].astype(int)
-        # Sort ascending by new column of integers
-        self.audio_df = self.audio_df.sort_values(by=['file_num'])
-
-        # Subset based on sentence dataframe values
-        self.audio_df = self.audio_df.loc[self.audio_df['file_num'].isin(self.sentence_df['sentence_num'])]
+        # Audio files of the selected sentences, sorted ascending 
+        # by sentence number
+        audio = sorted({(row[2], row[4]) for row in self.rows 
+            if row[4] is not None})
+        self.audio_df = pd.DataFrame({
+            'path': [path for _, path in audio],
+            'file_num': [num for num, _ in audio]})
+
+        # Attach stored RMS and the highest level that plays 
+        # without clipping from the corpus index (None where the 
+        # file is not indexed or has changed since indexing)
+        index = corpusmodel.CorpusIndex(self.sessionpars['Audio Files Path'].get())
+        self.audio_df = self.audio_df.assign(
+            rms=[index.rms(path) for path in self.audio_df['path']],
+            max_safe_lvl=[index.max_safe_level(path) 
+                for path in self.audio_df['path']])
+        self.min_safe_lvl = pd.to_numeric(self.audio_df['max_safe_lvl']).min()
+        self._report_safe_levels()
         print(self.audio_df)
         print("Models_listmodel_126: Audio list dataframe loaded into listmodel")
+
+
+    ###################
+    # Clipping limits #
+    ###################
+    def max_safe_levels(self):
+        """ Return a Series of the highest raw level (dB FS) 
+            that each loaded list can be presented at without 
+            any sentence clipping, indexed by list number. 
+            NaN where a sentence in the list is not indexed. 
+            Uses the corpus index only; no audio is read.
+        """
+        lists = self.sentence_df.set_index('sentence_num')['list_num']
+        levels = pd.to_numeric(self.audio_df['max_safe_lvl'])
+        df = pd.DataFrame({
+            'list_num': self.audio_df['file_num'].map(lists),
+            'max_safe_lvl': levels})
+        return df.groupby('list_num')['max_safe_lvl'].agg(
+            lambda x: x.min(skipna=False))
+
+
+    def clipping_trials(self, raw_lvl):
+        """ Return the audio_df rows that would clip at RAW_LVL 
+            (dB FS). Sentences that are not indexed are not 
+            included.
+        """
+        levels = pd.to_numeric(self.audio_df['max_safe_lvl'])
+        return self.audio_df.loc[levels < raw_lvl]
+
+
+    def _report_safe_levels(self):
+        """ Print the clipping limit of each loaded list """
+        for list_num, lvl in self.max_safe_levels().items():
+            if pd.isna(lvl):
+                print(f"Models_listmodel_160: List {list_num}: not " +
+                    "indexed; cannot predict clipping")
+            else:
+                print(f"Models_listmodel_163: List {list_num}: max safe " +
+                    f"raw level {lvl:.1f} dB FS")
@@ -0,0 +1,185 @@
+""" Corpus pack files: every sentence of a numbered .wav
+    corpus stored back to back in one binary file.
+
+    A pack is two files in the audio directory:
+        snr50_pack.bin: the raw PCM of every sentence,
+            in sentence order
+        snr50_pack.json: sample rate, channel count and data
+            type, plus the frame offset and length of each
+            sentence keyed by sentence number
+
+    The binary is memory-mapped once, so loading a list is a
+    lookup in the index and each trial is a slice of the one
+    mapping, instead of a glob plus a file open per sentence.
+    All files in a pack must share sample rate, channel
+    count and data type.
+
+    The stamp (mtime, size) of every source file is stored;
+    if a .wav file is present and has changed since packing,
+    the pack is ignored for that sentence. A pack can also be
+    used with the .wav files removed.
+
+    Build a pack from the snr50gui folder with:
+        python -m models.packmodel <audio directory>
+
+    Written by: Travis M. Moore
+    Created: Oct. 18, 2026
+    Last edited: Oct. 18, 2026
+"""
+
+###########
+# Imports #
+###########
+# Import data science packages
+import numpy as np
+
+# Import system packages
+import json
+import os
+import threading
+from glob import glob
+
+# Import audio packages
+from scipy.io import wavfile
+
+
+#########
+# BEGIN #
+#########
+BIN_NAME = 'snr50_pack.bin'
+INDEX_NAME = 'snr50_pack.json'
+
+
+class Pack:
+    """ Read-only view of the pack in DIRECTORY """
+    def __init__(self, directory):
+        self.directory = directory
+        with open(os.path.join(directory, INDEX_NAME), 'r') as fh:
+            index = json.load(fh)
+        self.fs = index['fs']
+        self.channels = index['channels']
+        self.dtype = np.dtype(index['dtype'])
+        self.entries = {int(num): entry
+            for num, entry in index['entries'].items()}
+        shape = (index['frames'],)
+        if self.channels > 1:
+            shape = shape + (self.channels,)
+        self.data = np.memmap(os.path.join(directory, BIN_NAME),
+            dtype=self.dtype, mode='r', shape=shape)
+        print(f"Models_Pack_67: Opened pack of {len(self.entries)} " +
+            f"sentences from {directory}")
+
+
+    def sentence_nums(self):
+        """ Sorted sentence numbers in the pack """
+        return sorted(self.entries)
+
+
+    def read(self, sentence_num):
+        """ Return (fs, samples) for SENTENCE_NUM, like
+            wavfile.read. The samples are a read-only view
+            of the mapping.
+        """
+        offset, length = self.entries[sentence_num][:2]
+        return self.fs, self.data[offset:offset+length]
+
+
+_packs = {}
+_packs_lock = threading.Lock()
+
+
+def open_pack(directory):
+    """ Return the Pack in DIRECTORY, or None if there is none.
+        Packs are opened once per process and reopened if the
+        index file changes.
+    """
+    index_path = os.path.join(directory, INDEX_NAME)
+    try:
+        stamp = os.stat(index_path).st_mtime_ns
+    except (FileNotFoundError, NotADirectoryError):
+        return None
+    key = os.path.abspath(directory)
+    with _packs_lock:
+        cached = _packs.get(key)
+        if cached is None or cached[0] != stamp:
+            cached = (stamp, Pack(directory))
+            _packs[key] = cached
+        return cached[1]
+
+
+def find(file_path):
+    """ Return (fs, samples) for a numbered .wav FILE_PATH from
+        the pack in its directory, or None if there is no pack,
+        the sentence is not in it, or the .wav file has changed
+        since packing.
+    """
+    directory, name = os.path.split(file_path)
+    stem, ext = os.path.splitext(name)
+    if ext.lower() != '.wav' or not stem.isdigit():
+        return None
+    pack = open_pack(directory)
+    if pack is None or int(stem) not in pack.entries:
+        return None
+    entry = pack.entries[int(stem)]
+    try:
+        stat = os.stat(file_path)
+        if (stat.st_mtime_ns, stat.st_size) != tuple(entry[2:4]):
+            return None
+    except FileNotFoundError:
+        # Packed corpus without the .wav files
+        pass
+    return pack.read(int(stem))
+
+
+def build_pack(directory):
+    """ Pack every numbered .wav file in DIRECTORY. The binary
+        and index are written to temporary files and renamed
+        into place, so an open pack is never half written.
+    """
+    files = {}
+    for file_path in glob(os.path.join(directory, '*.wav')):
+        stem = os.path.splitext(os.path.basename(file_path))[0]
+        if stem.isdigit():
+            files[int(stem)] = file_path
+        else:
+            print(f"Models_Pack_142: Skipping {file_path} (not numbered)")
+    if not files:
+        raise FileNotFoundError(f"No numbered .wav files in {directory}")
+
+    bin_path = os.path.join(directory, BIN_NAME)
+    index_path = os.path.join(directory, INDEX_NAME)
+    fmt = None
+    entries = {}
+    offset = 0
+    with open(bin_path + '.tmp', 'wb') as fh:
+        for num in sorted(files):
+            fs, data = wavfile.read(files[num], mmap=True)
+            this_fmt = (int(fs), 1 if data.ndim == 1 else data.shape[1],
+                str(data.dtype))
+            if fmt is None:
+                fmt = this_fmt
+            elif this_fmt != fmt:
+                raise ValueError(f"{files[num]} is {this_fmt} " +
+                    f"(fs, channels, dtype); the pack is {fmt}")
+            np.ascontiguousarray(data).tofile(fh)
+            stat = os.stat(files[num])
+            entries[num] = [offset, len(data), stat.st_mtime_ns, stat.st_size]
+            offset += len(data)
+
+    index = {'fs': fmt[0], 'channels': fmt[1], 'dtype': fmt[2],
+        'frames': offset, 'entries': entries}
+    with open(index_path + '.tmp', 'w') as fh:
+        json.dump(index, fh, separators=(',', ':'))
+    os.replace(bin_path + '.tmp', bin_path)
+    os.replace(index_path + '.tmp', index_path)
+    print(f"Models_Pack_172: Packed {len(entries)} sentences " +
+        f"({offset} frames) into {bin_path}")
+
+
+if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(
+        description="Pack the numbered .wav files in an audio directory")
+    parser.add_argument('directory')
+    args = parser.parse_args()
+    build_pack(args.directory)
@@ -5,6 +5,10 @@
 # IMPORTS  #
 ############
 # Import system packages
+import atexit
+import os
+import threading
+import time
 from pathlib import Path
 
 # Import data handling packages
@@ -34,6 +38,9 @@ class SessionParsModel:
         'Calibration File': {'type': 'str', 'value': 'cal_stim.wav'}
     }
 
+    # Minimum seconds between writes of the parameter file
+    debounce = 2.0
+
     def __init__(self):
         # Create session parameters file
         filename = 'snr50_pars.json'
@@ -41,6 +48,14 @@ class SessionParsModel:
         # Store settings file in user's home directory
         self.filepath = Path.home() / filename
 
+        # Changes since the last write; saves are coalesced so the 
+        # file is written at most once per debounce interval
+        self.dirty = False
+        self._last_save = 0.0
+        self._timer = None
+        self._lock = threading.RLock()
+        atexit.register(self.flush)
+
         # Load settings file
         self.load()
 
@@ -70,22 +85,66 @@ class SessionParsModel:
 
 
     def save(self):
-        """ Save current session parameters to file 
+        """ Save current session parameters to file. Does nothing 
+            if nothing has changed. Never writes on the calling 
+            thread: the write is handed to a timer thread (which 
+            picks up any further changes), no sooner than the 
+            debounce interval after the last write. Use flush() 
+            to write immediately.
+        """
+        with self._lock:
+            if not self.dirty or self._timer is not None:
+                return
+            wait = max(0.0, 
+                self._last_save + self.debounce - time.monotonic())
+            self._timer = threading.Timer(wait, self._deferred_save)
+            self._timer.daemon = True
+            self._timer.start()
+
+
+    def _deferred_save(self):
+        with self._lock:
+            self._timer = None
+            if self.dirty:
+                self._write()
+
+
+    def flush(self):
+        """ Write any pending changes now (e.g., on exit) """
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if self.dirty:
+                self._write()
+
+
+    def _write(self):
+        """ Write the parameters atomically: to a temporary file, 
+            then renamed over the old one, so the file is never 
+            left half written.
         """
         # Write to JSON file
         print("Models_Session_78: Writing session pars from model to file...")
-        with open(self.filepath, 'w') as fh:
+        tmp_path = self.filepath.with_name(self.filepath.name + '.tmp')
+        with open(tmp_path, 'w') as fh:
             json.dump(self.fields, fh)
+            fh.flush()
+            os.fsync(fh.fileno())
+        os.replace(tmp_path, self.filepath)
+        self.dirty = False
+        self._last_save = time.monotonic()
 
 
     def set(self, key, value):
         """ Set a variable value """
-        print("Models_Session_85: Setting sessionpars model " +
-            "fields with running vals...")
         if (
             key in self.fields and 
             type(value).__name__ == self.fields[key]['type']
         ):
-            self.fields[key]['value'] = value
+            with self._lock:
+                if self.fields[key]['value'] != value:
+                    self.fields[key]['value'] = value
+                    self.dirty = True
         else:
             raise ValueError("Bad key or wrong variable type")
@@ -0,0 +1,259 @@
+""" Model to write trial data to a typed, columnar store
+    alongside the .csv file.
+
+    The schema is declared up front from the session
+    parameter and score model field types, so every record
+    has the same typed columns in the same order whatever
+    order its keys arrive in. Records are appended as Arrow
+    IPC stream batches (one per trial), which survive a crash
+    up to the last complete trial and load without any text
+    parsing. As in CSVModel, records are checked against the
+    schema on the caller's thread and written to disk by a
+    background thread, so disk latency never holds up the GUI.
+
+    pyarrow (14 or later) is optional and not in the Pipfile;
+    install it with: pipenv run pip install "pyarrow>=14".
+    Without it the store is disabled and only the .csv file
+    is written.
+
+    Load many sessions for analysis with:
+        df = storemodel.load_trials('path/to/data')
+
+    Written by: Travis M. Moore
+    Created: Oct. 18, 2026
+    Last edited: Oct. 18, 2026
+"""
+
+############
+# IMPORTS  #
+############
+# Import system packages
+import atexit
+import os
+import queue
+import threading
+from glob import glob
+from pathlib import Path
+
+# Import data handling packages
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+
+#########
+# MODEL #
+#########
+# Field types (as used in the model field dicts) and their
+# Arrow and Python types
+_types = {
+    'str': ('string', str),
+    'int': ('int64', int),
+    'float': ('float64', float),
+    'bool': ('bool_', bool)
+}
+
+
+def make_schema(*field_dicts, exclude=()):
+    """ Return an ordered {name: type} schema from model field
+        dicts (e.g., SessionParsModel.fields, ScoreModel.fields),
+        leaving out the names in EXCLUDE.
+    """
+    schema = {}
+    for fields in field_dicts:
+        for key, spec in fields.items():
+            if key in exclude:
+                continue
+            if not isinstance(spec, dict) or spec.get('type') not in _types:
+                raise ValueError(f"No declared type for field '{key}'")
+            schema[key] = spec['type']
+    return schema
+
+
+class TrialStore:
+    """ Append typed trial records to an Arrow IPC stream file.
+        SCHEMA is an ordered {name: type} dict (see make_schema).
+    """
+    suffix = '.arrow'
+
+    def __init__(self, schema, maxsize=256):
+        self.schema = dict(schema)
+        self.file = None
+        self._source = None
+        self._sink = None
+        self._writer = None
+        self._queue = queue.Queue(maxsize=maxsize)
+        self._thread = None
+        self._error = None
+        self.enabled = pa is not None
+        if not self.enabled:
+            print("Models_Store_82: pyarrow not installed; " +
+                "trial store disabled (the .csv file is still written)")
+            return
+        self._arrow_schema = pa.schema([
+            (key, getattr(pa, _types[kind][0])())
+            for key, kind in self.schema.items()])
+        atexit.register(self.close)
+
+
+    def _coerce(self, data):
+        """ Return DATA as a row in schema order. Missing fields
+            are null; unknown fields or values that cannot be
+            converted to their declared type raise ValueError.
+        """
+        extra = set(data) - set(self.schema)
+        if extra:
+            raise ValueError(f"Fields not in the trial schema: {sorted(extra)}")
+        row = {}
+        for key, kind in self.schema.items():
+            value = data.get(key)
+            if value is None or (value == '' and kind != 'str'):
+                row[key] = None
+            else:
+                row[key] = _types[kind][1](value)
+        return row
+
+
+    def open(self, file_path):
+        """ Start a new stream at FILE_PATH (the suffix is replaced
+            with .arrow). An existing file is not appended to;
+            a numbered name is used instead. Runs on the writer 
+            thread.
+        """
+        self._finish()
+        path = Path(file_path).with_suffix(self.suffix)
+        count = 1
+        while path.exists():
+            path = Path(file_path).with_name(
+                f"{Path(file_path).stem}_{count}{self.suffix}")
+            count += 1
+        self.file = path
+        self._sink = pa.OSFile(str(path), 'wb')
+        self._writer = pa.ipc.new_stream(self._sink, self._arrow_schema)
+
+
+    def _run(self):
+        """ Write queued records (runs on the writer thread) """
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    break
+                row, file_path = item
+                if self._writer is None or self._source != file_path:
+                    self.open(file_path)
+                    self._source = file_path
+                batch = pa.RecordBatch.from_pylist([row],
+                    schema=self._arrow_schema)
+                self._writer.write_batch(batch)
+                self._sink.flush()
+            except (pa.ArrowInvalid, OSError, ValueError) as err:
+                self._error = err
+                print(f"Models_Store_151: Could not write record: {err}")
+            finally:
+                self._queue.task_done()
+
+        # Closing: finish the stream
+        try:
+            self._finish()
+        except (pa.ArrowInvalid, OSError) as err:
+            self._error = err
+            print(f"Models_Store_160: Could not close {self.file}: {err}")
+
+
+    def check(self):
+        """ Raise PermissionError for a failure of an earlier 
+            background write (reported once)
+        """
+        if self._error is not None:
+            err, self._error = self._error, None
+            raise PermissionError(f"Could not write to {self.file}: {err}")
+
+
+    def write(self, data, file_path):
+        """ Append one trial record. FILE_PATH is the session's
+            data file name; a new stream is started when it
+            changes. Raises ValueError if DATA does not fit the 
+            schema, and PermissionError if an earlier record 
+            could not be written.
+        """
+        if not self.enabled:
+            return
+        row = self._coerce(data)
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run,
+                name='TrialStore writer', daemon=True)
+            self._thread.start()
+
+        # Report a failure from an earlier background write
+        self.check()
+
+        # Hand the row to the writer thread
+        self._queue.put((row, file_path))
+
+
+    def _finish(self):
+        """ Finish the current stream and close its file """
+        if self._writer is not None:
+            writer, sink = self._writer, self._sink
+            self._writer = None
+            self._sink = None
+            writer.close()
+            sink.close()
+
+
+    def close(self):
+        """ Write any queued records, finish the stream and close 
+            the file. A failure is kept for check().
+        """
+        if self._thread is None:
+            return
+        self._queue.put(None)
+        self._thread.join()
+        self._thread = None
+        self._source = None
+
+
+def _read_stream(file_path):
+    """ Read every complete batch of one stream file (a file cut
+        short by a crash keeps the trials written before it).
+    """
+    batches = []
+    with pa.OSFile(str(file_path), 'rb') as source:
+        try:
+            reader = pa.ipc.open_stream(source)
+            for batch in reader:
+                batches.append(batch)
+        except (pa.ArrowInvalid, OSError):
+            pass
+    if not batches:
+        return None
+    return pa.Table.from_batches(batches)
+
+
+def load_trials(path):
+    """ Load and concatenate the trial stores in PATH (a
+        directory, a glob pattern or a list of files) into one
+        pandas DataFrame, with a 'Session' column holding each
+        file's name. Requires pyarrow.
+    """
+    if pa is None:
+        raise ImportError("load_trials requires pyarrow")
+    if isinstance(path, (list, tuple)):
+        files = list(path)
+    elif os.path.isdir(path):
+        files = sorted(glob(os.path.join(path, '*' + TrialStore.suffix)))
+    else:
+        files = sorted(glob(path))
+
+    tables = []
+    for file_path in files:
+        table = _read_stream(file_path)
+        if table is None:
+            continue
+        session = pa.array([Path(file_path).stem] * table.num_rows)
+        tables.append(table.append_column('Session', session))
+    if not tables:
+        raise FileNotFoundError(f"No trial stores found in {path}")
+    return pa.concat_tables(tables, promote_options='default').to_pandas()
@@ -11,12 +11,13 @@ import tkinter as tk
 from tkinter import ttk
 from tkinter import messagebox
 
-# Import data science packages
-import numpy as np
-
 # Import text packages
 import string # for creating alphabet list
 
+# Import system packages
+import queue
+import time
+
 # Import custom modules
 from models import audiomodel as a
 
@@ -36,6 +37,15 @@ class MainFrame(ttk.Frame):
         self.counter = 0
         self.outcome = None
 
+        # Decode the next trial's audio in the background
+        self.prefetcher = a.Prefetcher()
+        # Click-to-sound latency tracking
+        self.click_time = None
+        self.latencies = []
+        # Finished playbacks, posted from the audio thread
+        self.finished = queue.SimpleQueue()
+        self._poll_finished()
+
         # Set widget display options
         self.myFont = tk.font.nametofont('TkDefaultFont').configure(size=10)
         options = {'padx':10, 'pady':10}
@@ -241,6 +251,7 @@ class MainFrame(ttk.Frame):
         # Load stimulus lists again
         # Required if no stimuli were available on init
         self._load_listmodel()
+        self.prefetcher.clear()
 
         # Load starting level based on value specified in session dialog.
         self.sessionpars['new_db_lvl'].set(
@@ -258,6 +269,9 @@ class MainFrame(ttk.Frame):
         """ Update outcome to incorrect. 
             Call remaining task functions. 
         """
+        # Start click-to-sound latency timer
+        self.click_time = time.perf_counter()
+
         # Set response outcome to incorrect (0)
         # Based on "wrong" button click
         self.outcome = 0
@@ -270,6 +284,9 @@ class MainFrame(ttk.Frame):
         """ Update outcome to correct.
             Call remaining task functions. 
         """
+        # Start click-to-sound latency timer
+        self.click_time = time.perf_counter()
+
         # Set response outcome to correct (1)
         # Based on "right" button click
         self.outcome = 1
@@ -362,8 +379,11 @@ class MainFrame(ttk.Frame):
             # Create audio object
             print(f"Views_Main_363: Raw level sent to audio object: " +
                 f"{self.sessionpars['new_raw_lvl'].get()}")
-            audio = a.Audio(self.audio_df.iloc[self.counter]['path'], 
-                self.sessionpars['new_raw_lvl'].get())
+            # Usually already decoded by the prefetcher
+            audio = self.prefetcher.get(
+                self.audio_df.iloc[self.counter]['path'], 
+                self.sessionpars['new_raw_lvl'].get(),
+                self.audio_df.iloc[self.counter]['rms'])
 
             # Disable right/wrong buttons to prevent multiple clicks
             self._disable_btns("Presenting")
@@ -373,9 +393,10 @@ class MainFrame(ttk.Frame):
 
             # Present audio
             try:
-                audio.play(
+                playback = audio.play(
                     device_id=self.sessionpars['Audio Device ID'].get(),
-                    channels=self.sessionpars['Speaker Number'].get()
+                    channels=self.sessionpars['Speaker Number'].get(),
+                    on_done=self.finished.put
                     )
             except ValueError:
                 # Show error messagebox
@@ -394,9 +415,20 @@ class MainFrame(ttk.Frame):
                     sticky='nsew', pady=(0,10))
                 return
 
-            # Re-enable buttons after audio has finished playing
-            # NOTE: .after expects an integer duration in ms
-            self.after((int(np.ceil(audio.dur)))*1000, self._enable_btns)
+            # Report click-to-sound latency once the first 
+            # sample has reached the output
+            if self.click_time is not None:
+                self._report_latency(playback, self.click_time)
+                self.click_time = None
+
+            # Decode the next trial's audio while this one is scored
+            if self.counter + 1 < len(self.audio_df):
+                self.prefetcher.prefetch(
+                    self.audio_df.iloc[self.counter+1]['path'],
+                    self.audio_df.iloc[self.counter+1]['rms'])
+
+            # Buttons are re-enabled by _poll_finished when the 
+            # audio engine reports the end of playback
         except KeyError:
             messagebox.showerror(title="Cannot Find File",
                 message="Requested audio file does not exist!")
@@ -404,6 +436,37 @@ class MainFrame(ttk.Frame):
             return
 
 
+    def _poll_finished(self):
+        """ Check for playbacks finished by the audio engine and 
+            re-enable the buttons when the last sample has 
+            reached the output.
+        """
+        try:
+            while True:
+                playback = self.finished.get_nowait()
+                self.after(int(playback.remaining() * 1000), 
+                    self._enable_btns)
+        except queue.Empty:
+            pass
+        self.after(10, self._poll_finished)
+
+
+    def _report_latency(self, playback, click_time):
+        """ Print the time from the response click to the 
+            start of playback (from the output engine's 
+            start timestamp).
+        """
+        if not playback.started.is_set():
+            # Dropped before it started: nothing was heard
+            if not playback.done.is_set():
+                self.after(5, self._report_latency, playback, click_time)
+            return
+        latency = (playback.start_time - click_time) * 1000
+        self.latencies.append(latency)
+        print("Views_Main_400: Click-to-sound latency: " +
+            f"{latency:.1f} ms")
+
+
     ##################################
     # Display words and checkbuttons #
     ##################################